@@ -12,6 +12,8 @@ class Settings(BaseSettings):
     model_name: str = "deepseek-chat"
     temperature: float = 0.7
     max_tokens: int = 20000
+    llm_cache_size: int = 0  # Responses kept in memory for identical requests, 0 disables caching
+    llm_cache_ttl_seconds: int = 300
     
     # MongoDB configuration
     mongodb_uri: str = "mongodb://mongodb:27017"
@@ -36,10 +38,14 @@ class Settings(BaseSettings):
     sandbox_http_proxy: str | None = None
     sandbox_no_proxy: str | None = None
     
+    # Browser configuration
+    browser_context_pool_size: int = 0  # Idle contexts kept for reuse per process, 0 disables pooling
+    
     # Search engine configuration
     search_provider: str | None = "bing"  # "baidu", "google", "bing"
     google_search_api_key: str | None = None
     google_search_engine_id: str | None = None
+    search_cache_ttl_seconds: int = 120  # Results of identical searches are reused across sessions, 0 disables caching
     
     # Auth configuration
     auth_provider: str = "password"  # "password", "none", "local"
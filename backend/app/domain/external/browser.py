@@ -72,7 +72,8 @@ class Browser(Protocol):
     
     async def screenshot(
         self,
-        full_page: Optional[bool] = False
+        full_page: Optional[bool] = False,
+        image_format: Optional[str] = None
     ) -> bytes:
         """Take a screenshot of the current page"""
         ...
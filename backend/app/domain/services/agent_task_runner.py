@@ -98,7 +98,7 @@ class AgentTaskRunner(TaskRunner):
     
     async def _get_browser_screenshot(self) -> str:
         screenshot = await self._browser.screenshot()
-        result = await self._file_storage.upload_file(screenshot, "screenshot.png", self._user_id)
+        result = await self._file_storage.upload_file(screenshot, "screenshot.jpg", self._user_id)
         return result.file_id
 
     async def _sync_file_to_storage(self, file_path: str) -> Optional[FileInfo]:
@@ -165,7 +165,8 @@ class AgentTaskRunner(TaskRunner):
                     event.tool_content = BrowserToolContent(screenshot=await self._get_browser_screenshot())
                 elif event.tool_name == "search":
                     search_results: ToolResult[SearchResults] = event.function_result
-                    logger.debug(f"Search tool results: {search_results}")
+                    # Lazy formatting, tool results are only rendered when debug logging is enabled
+                    logger.debug("Search tool results: %s", search_results)
                     event.tool_content = SearchToolContent(results=search_results.data.results)
                 elif event.tool_name == "shell":
                     if "id" in event.function_args:
@@ -183,26 +184,27 @@ class AgentTaskRunner(TaskRunner):
                     else:
                         event.tool_content = FileToolContent(content="(No Content)")
                 elif event.tool_name == "mcp":
-                    logger.debug(f"Processing MCP tool event: function_result={event.function_result}")
+                    logger.debug("Processing MCP tool event: function_result=%s", event.function_result)
                     if event.function_result:
                         if hasattr(event.function_result, 'data') and event.function_result.data:
-                            logger.debug(f"MCP tool result data: {event.function_result.data}")
+                            logger.debug("MCP tool result data: %s", event.function_result.data)
                             event.tool_content = McpToolContent(result=event.function_result.data)
                         elif hasattr(event.function_result, 'success') and event.function_result.success:
-                            logger.debug(f"MCP tool result (success, no data): {event.function_result}")
+                            logger.debug("MCP tool result (success, no data): %s", event.function_result)
                             result_data = event.function_result.model_dump() if hasattr(event.function_result, 'model_dump') else str(event.function_result)
                             event.tool_content = McpToolContent(result=result_data)
                         else:
-                            logger.debug(f"MCP tool result (fallback): {event.function_result}")
+                            logger.debug("MCP tool result (fallback): %s", event.function_result)
                             event.tool_content = McpToolContent(result=str(event.function_result))
                     else:
                         logger.warning("MCP tool: No function_result found")
                         event.tool_content = McpToolContent(result="No result available")
                     
-                    logger.debug(f"MCP tool_content set to: {event.tool_content}")
+                    logger.debug("MCP tool_content set to: %s", event.tool_content)
                     if event.tool_content:
-                        logger.debug(f"MCP tool_content.result: {event.tool_content.result}")
-                        logger.debug(f"MCP tool_content dict: {event.tool_content.model_dump()}")
+                        logger.debug("MCP tool_content.result: %s", event.tool_content.result)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(f"MCP tool_content dict: {event.tool_content.model_dump()}")
                 else:
                     logger.warning(f"Agent {self._agent_id} received unknown tool event: {event.tool_name}")
         except Exception as e:
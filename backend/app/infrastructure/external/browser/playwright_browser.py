@@ -1,8 +1,22 @@
-from typing import Dict, Any, Optional, List
-from playwright.async_api import async_playwright, Browser, Page
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Deque, TypeVar
+from playwright.async_api import async_playwright, Browser, BrowserContext, ConsoleMessage, Page
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from websockets.exceptions import InvalidStatus, WebSocketException
+from collections import OrderedDict, deque
+from functools import lru_cache
 import asyncio
-from markdownify import markdownify
+import base64
+import re
+try:
+    # Rust-backed converter, much faster than markdownify; fall back when not installed
+    from html_to_markdown import convert as _convert_html
+
+    def _html_to_markdown(html: str) -> str:
+        return _convert_html(html).content
+except ImportError:
+    from markdownify import markdownify as _html_to_markdown
 from app.infrastructure.external.llm.openai_llm import OpenAILLM
+from app.infrastructure.utils.backoff import backoff_delay
 from app.core.config import get_settings
 from app.domain.models.tool_result import ToolResult
 import logging
@@ -10,128 +24,680 @@ import logging
 # Set up logger for this module
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# Page content limits for LLM extraction: Markdown sent to the LLM, and HTML
+# converted to produce it
+_MAX_MARKDOWN_LENGTH = 50000
+_MAX_HTML_LENGTH = 200000
+
+# Console messages kept per session for console_view
+_MAX_CONSOLE_LOGS = 10000
+
+# Errors that indicate a transient transport problem with the CDP endpoint
+# (e.g. the sandbox Chrome is still starting or just restarted)
+_RECOVERABLE_ERRORS = (ConnectionError, asyncio.TimeoutError, PlaywrightTimeoutError, WebSocketException)
+
+# Handshakes rejected by the endpoint (bad URL, auth) fail the same way on every retry
+_PERMANENT_ERRORS = (InvalidStatus,)
+
+# Playwright surfaces socket failures from the driver as a generic Error,
+# so fall back to matching the message for those
+_RECOVERABLE_ERROR_MARKERS = (
+    "ECONNREFUSED",
+    "ECONNRESET",
+    "ETIMEDOUT",
+    "socket hang up",
+)
+
+# Playwright reports a rejected CDP handshake as "WebSocket error: <url> 404 Not Found"
+_HTTP_STATUS_RE = re.compile(r"\b[1-5]\d\d [A-Z]")
+
+# Messages of operations on a closed Browser, BrowserContext or Page. Retrying on
+# the same handle cannot succeed, the handle has to be replaced.
+_TARGET_CLOSED_MARKERS = (
+    "has been closed",
+    "Target closed",
+)
+
+
+def _is_recoverable(error: Exception) -> bool:
+    """Check whether an error is worth retrying"""
+    if isinstance(error, _PERMANENT_ERRORS):
+        return False
+    if isinstance(error, _RECOVERABLE_ERRORS):
+        return True
+    if isinstance(error, PlaywrightError):
+        message = str(error)
+        if "WebSocket error" in message and _HTTP_STATUS_RE.search(message):
+            return False
+        return any(marker in message for marker in _RECOVERABLE_ERROR_MARKERS)
+    return False
+
+
+def _is_target_closed(error: Exception) -> bool:
+    """Check whether an error comes from using a closed browser, context or page"""
+    if isinstance(error, PlaywrightError):
+        message = str(error)
+        return any(marker in message for marker in _TARGET_CLOSED_MARKERS)
+    return False
+
+
+async def _retry_with_backoff(
+    fn: Callable[[], Awaitable[T]],
+    base: float = 1.0,
+    cap: float = 10.0,
+    jitter: float = 0.5,
+    max_retries: int = 5,
+) -> T:
+    """Call an async function, retrying recoverable errors with capped, jittered exponential backoff
+
+    Unrecoverable errors (bad URL, protocol errors, ...) are raised immediately.
+    The jitter keeps many sessions reconnecting to the same CDP endpoint from
+    retrying in lockstep.
+
+    Args:
+        fn: Zero-argument coroutine function to call
+        base: Initial delay (seconds)
+        cap: Maximum delay before jitter is applied (seconds)
+        jitter: Relative jitter applied to every delay, in [0, 1)
+        max_retries: Maximum number of attempts
+
+    Returns:
+        The result of fn
+    """
+    for attempt in range(max_retries):
+        try:
+            return await fn()
+        except Exception as e:
+            if not _is_recoverable(e) or attempt == max_retries - 1:
+                raise
+            delay = backoff_delay(attempt, base, cap, jitter)
+            logger.warning(f"Browser operation failed, will retry in {delay:.2f} seconds: {e}")
+            await asyncio.sleep(delay)
+
+
+@lru_cache()
+def _get_llm() -> OpenAILLM:
+    """Get the LLM used for page content extraction, shared by all sessions
+
+    Sharing one client lets extraction calls from every session reuse the same
+    HTTP connection pool.
+    """
+    return OpenAILLM()
+
+
+# Process-wide Playwright runtime and CDP connections, shared by every
+# PlaywrightBrowser instance. Instances only own their BrowserContext and Page.
+_PW_RUNTIME = None
+_PW_RUNTIME_LOCK = asyncio.Lock()
+_BROWSERS: Dict[str, Browser] = {}
+# Connections being established, per cdp_url. Every sandbox has its own endpoint,
+# so a slow connect (Chrome still starting) only holds up sessions on that sandbox.
+_CONNECTING: Dict[str, "asyncio.Task[Browser]"] = {}
+
+# Idle contexts released by finished sessions, mapped to their cdp_url and
+# ordered from least to most recently released
+_IDLE_CONTEXTS: "OrderedDict[BrowserContext, str]" = OrderedDict()
+
+
+async def _get_runtime():
+    """Get the Playwright runtime, starting it on first use"""
+    global _PW_RUNTIME
+    async with _PW_RUNTIME_LOCK:
+        if _PW_RUNTIME is None:
+            _PW_RUNTIME = await async_playwright().start()
+        return _PW_RUNTIME
+
+
+async def _reset_runtime(runtime):
+    """Forget a Playwright runtime whose driver is gone, the next _get_runtime starts a new one
+
+    Browsers and contexts connected through the runtime are dropped with it.
+    Does nothing if another session already replaced the runtime.
+    """
+    global _PW_RUNTIME
+    async with _PW_RUNTIME_LOCK:
+        if _PW_RUNTIME is not runtime:
+            return
+        _PW_RUNTIME = None
+        _BROWSERS.clear()
+        _IDLE_CONTEXTS.clear()
+        try:
+            await runtime.stop()
+        except Exception as e:
+            logger.debug(f"Failed to stop playwright, ignoring: {e}")
+
+
+def _is_driver_gone(error: Exception) -> bool:
+    """Check whether a runtime call failed because the Playwright driver process died"""
+    # The driver connection closing fails pending calls with TargetClosedError
+    # or with the transport error itself
+    return _is_target_closed(error) or "Connection closed while reading from the driver" in str(error)
+
+
+async def _connect_browser(cdp_url: str) -> Browser:
+    """Connect to the browser at cdp_url and register it as shared"""
+    runtime = await _get_runtime()
+    try:
+        browser = await _retry_with_backoff(
+            lambda: runtime.chromium.connect_over_cdp(cdp_url)
+        )
+    except Exception as e:
+        if not _is_driver_gone(e):
+            raise
+        # Every later call through this runtime would fail the same way, start a new one
+        logger.warning(f"Playwright driver is gone, restarting it: {e}")
+        await _reset_runtime(runtime)
+        runtime = await _get_runtime()
+        browser = await _retry_with_backoff(
+            lambda: runtime.chromium.connect_over_cdp(cdp_url)
+        )
+    _BROWSERS[cdp_url] = browser
+    logger.info(f"Connected to shared browser at {cdp_url}")
+    return browser
+
+
+async def _get_shared_browser(cdp_url: str) -> Browser:
+    """Get the shared browser connected to cdp_url, starting Playwright and connecting on first use
+
+    Sessions asking for the same endpoint while it connects wait for the same
+    connection attempt.
+
+    Args:
+        cdp_url: Chrome DevTools Protocol endpoint
+
+    Returns:
+        Browser: Connected browser shared by all sessions using this endpoint
+    """
+    browser = _BROWSERS.get(cdp_url)
+    if browser and browser.is_connected():
+        return browser
+
+    task = _CONNECTING.get(cdp_url)
+    if task is None:
+        task = asyncio.create_task(_connect_browser(cdp_url))
+        _CONNECTING[cdp_url] = task
+        task.add_done_callback(lambda t: _CONNECTING.pop(cdp_url) if _CONNECTING.get(cdp_url) is t else None)
+    # Shielded so a cancelled session does not cancel the connect for the others
+    return await asyncio.shield(task)
+
+
+async def _forget_browser(cdp_url: str, browser: Browser):
+    """Drop a dead shared browser so the next session on cdp_url reconnects"""
+    if _BROWSERS.get(cdp_url) is browser:
+        del _BROWSERS[cdp_url]
+    for context in [context for context in _IDLE_CONTEXTS if context.browser is browser]:
+        del _IDLE_CONTEXTS[context]
+    try:
+        await browser.close()
+    except Exception as e:
+        logger.debug(f"Failed to disconnect browser at {cdp_url}, ignoring: {e}")
+
+
+def _acquire_pooled_context(cdp_url: str) -> Optional[BrowserContext]:
+    """Take the most recently released idle context for cdp_url, if any"""
+    for context, url in reversed(list(_IDLE_CONTEXTS.items())):
+        if url != cdp_url:
+            continue
+        del _IDLE_CONTEXTS[context]
+        # Contexts of a dropped connection are unusable, just forget them
+        if context.browser and context.browser.is_connected():
+            return context
+    return None
+
+
+async def _release_context(cdp_url: str, context: BrowserContext, pool_size: int):
+    """Return a context to the idle pool, or close it when pooling is disabled
+
+    Cookies are cleared before the context is pooled. Other storage (local
+    storage, HTTP cache, service workers) is kept, so pooling is only suitable
+    for deployments that do not need full isolation between sessions. When the
+    pool is full the least recently released context is closed.
+
+    Args:
+        cdp_url: Chrome DevTools Protocol endpoint the context belongs to
+        context: Context to release
+        pool_size: Maximum number of idle contexts to keep, 0 disables pooling
+    """
+    evicted = [context]
+    if pool_size > 0 and context.browser and context.browser.is_connected():
+        try:
+            # Drop the session's page, popups and other pages it left behind, concurrently
+            await asyncio.gather(*(page.close() for page in context.pages))
+            await context.clear_cookies()
+            _IDLE_CONTEXTS[context] = cdp_url
+            evicted = []
+        except Exception as e:
+            logger.debug(f"Failed to reset context for reuse, closing it: {e}")
+        while len(_IDLE_CONTEXTS) > pool_size:
+            evicted.append(_IDLE_CONTEXTS.popitem(last=False)[0])
+
+    # Closing a context also closes its pages
+    results = await asyncio.gather(*(stale.close() for stale in evicted), return_exceptions=True)
+    if any(isinstance(result, Exception) for result in results):
+        logger.debug("Failed to close context, ignoring")
+
+
+async def shutdown_shared_browsers():
+    """Disconnect all shared browsers and stop the Playwright runtime
+
+    Disconnecting does not terminate the remote Chrome processes. Must be called
+    from the event loop the connections were created on (application shutdown).
+    """
+    global _PW_RUNTIME
+    for task in list(_CONNECTING.values()):
+        task.cancel()
+    _CONNECTING.clear()
+    async with _PW_RUNTIME_LOCK:
+        for cdp_url, browser in list(_BROWSERS.items()):
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.debug(f"Failed to disconnect browser at {cdp_url}, ignoring: {e}")
+        _BROWSERS.clear()
+        if _PW_RUNTIME is not None:
+            try:
+                await _PW_RUNTIME.stop()
+            except Exception as e:
+                logger.debug(f"Failed to stop playwright, ignoring: {e}")
+            _PW_RUNTIME = None
+        # Idle contexts die with their browser connection
+        _IDLE_CONTEXTS.clear()
+
+
+# Single viewport scan shared by view_page and the interactive element listing.
+# Viewport rects come from one IntersectionObserver pass and computed style is
+# only read for elements inside the viewport. Interactive elements get a
+# data-manus-id and, when withContent is set, visible meaningful elements are
+# collected as HTML in the same pass.
+_SCAN_JS = """async (withContent) => {
+    const INTERACTIVE_SELECTOR = 'button, a, input, textarea, select, [role="button"], [tabindex]:not([tabindex="-1"])';
+    const interactiveElements = [];
+    const visibleElements = [];
+    const viewportHeight = window.innerHeight;
+    const viewportWidth = window.innerWidth;
+    
+    // Cleared before anything is read, so a mutation, scroll or resize that
+    // arrives while the scan waits for the observer below marks the page dirty again
+    window.__manusDirty = false;
+    
+    // Content needs every element, the interactive listing only the candidates
+    const elements = document.querySelectorAll(withContent ? 'body *' : INTERACTIVE_SELECTOR);
+    
+    // Collect the rects of all candidates intersecting the viewport from a single
+    // IntersectionObserver callback instead of forcing layout per element.
+    // Resolves null if the observer does not report in time (e.g. no rendering).
+    const intersectingRects = await new Promise((resolve) => {
+        if (!elements.length || typeof IntersectionObserver === 'undefined') {
+            resolve(null);
+            return;
+        }
+        let settled = false;
+        const observer = new IntersectionObserver((entries) => {
+            if (settled) return;
+            settled = true;
+            observer.disconnect();
+            const rects = new Map();
+            for (const entry of entries) {
+                if (entry.isIntersecting) rects.set(entry.target, entry.boundingClientRect);
+            }
+            resolve(rects);
+        });
+        for (const element of elements) observer.observe(element);
+        setTimeout(() => {
+            if (settled) return;
+            settled = true;
+            observer.disconnect();
+            resolve(null);
+        }, 300);
+    });
+    
+    // Add label and placeholder information for input elements
+    const annotateInput = (element, text, stripValue) => {
+        // Get associated label text
+        let labelText = '';
+        if (element.id) {
+            const label = document.querySelector(`label[for="${element.id}"]`);
+            if (label) {
+                labelText = label.innerText.trim();
+            }
+        }
+        
+        // Look for parent or sibling label
+        if (!labelText) {
+            const parentLabel = element.closest('label');
+            if (parentLabel) {
+                labelText = parentLabel.innerText.trim();
+                if (stripValue) {
+                    labelText = labelText.replace(element.value, '').trim();
+                }
+            }
+        }
+        
+        // Add label information
+        if (labelText) {
+            text = `[Label: ${labelText}] ${text}`;
+        }
+        
+        // Add placeholder information
+        if (element.placeholder) {
+            text = `${text} [Placeholder: ${element.placeholder}]`;
+        }
+        return text;
+    };
+    
+    let validElementIndex = 0; // For generating consecutive indices
+    
+    for (const element of elements) {
+        // Check if the element is in the viewport and visible
+        const rect = intersectingRects ? intersectingRects.get(element) : element.getBoundingClientRect();
+        if (!rect) continue;
+        
+        // Element must have some dimensions
+        if (rect.width === 0 || rect.height === 0) continue;
+        
+        // Element must be within the viewport
+        if (
+            rect.bottom < 0 || 
+            rect.top > viewportHeight ||
+            rect.right < 0 || 
+            rect.left > viewportWidth
+        ) continue;
+        
+        // Check if the element is visible (not hidden by CSS), only for survivors
+        const style = window.getComputedStyle(element);
+        if (
+            style.display === 'none' || 
+            style.visibility === 'hidden' || 
+            style.opacity === '0'
+        ) continue;
+        
+        // If it's a text node or meaningful element, add it to the content
+        if (withContent && (
+            element.innerText || 
+            element.tagName === 'IMG' || 
+            element.tagName === 'INPUT' || 
+            element.tagName === 'BUTTON'
+        )) {
+            visibleElements.push(element);
+        }
+        
+        if (withContent && !element.matches(INTERACTIVE_SELECTOR)) continue;
+        
+        // Get element type and text
+        let tagName = element.tagName.toLowerCase();
+        let text = '';
+        
+        if (element.value && ['input', 'textarea', 'select'].includes(tagName)) {
+            text = element.value;
+            if (tagName === 'input') {
+                text = annotateInput(element, text, true);
+            }
+        } else if (element.innerText) {
+            text = element.innerText.trim().replace(/\\s+/g, ' ');
+        } else if (element.alt) { // For image buttons
+            text = element.alt;
+        } else if (element.title) { // For elements with title
+            text = element.title;
+        } else if (element.placeholder) { // For placeholder text
+            text = `[Placeholder: ${element.placeholder}]`;
+        } else if (element.type) { // For input type
+            text = `[${element.type}]`;
+            // Add label and placeholder information for text-less input elements
+            if (tagName === 'input') {
+                text = annotateInput(element, text, false);
+            }
+        } else {
+            text = '[No text]';
+        }
+        
+        // Maximum limit on text length to keep it clear
+        if (text.length > 100) {
+            text = text.substring(0, 97) + '...';
+        }
+        
+        // Only add data-manus-id attribute to elements that meet the conditions
+        element.setAttribute('data-manus-id', `manus-element-${validElementIndex}`);
+                                                
+        // Build selector - using only data-manus-id
+        const selector = `[data-manus-id="manus-element-${validElementIndex}"]`;
+        
+        // Add element information to the array
+        interactiveElements.push({
+            index: validElementIndex,  // Use consecutive index
+            tag: tagName,
+            text: text,
+            selector: selector
+        });
+        
+        validElementIndex++; // Increment valid element counter
+    }
+    
+    // Take our own data-manus-id updates before the observer callback sees them,
+    // any other pending mutation still marks the page dirty
+    if (window.__manusObserver) {
+        for (const record of window.__manusObserver.takeRecords()) {
+            if (record.attributeName !== 'data-manus-id') {
+                window.__manusDirty = true;
+                break;
+            }
+        }
+    }
+    
+    return {
+        interactive: interactiveElements,
+        // Serialized after the loop so the HTML carries the data-manus-id attributes
+        content: withContent ? '<div>' + visibleElements.map(el => el.outerHTML).join('') + '</div>' : null
+    };
+}"""
+
+# Installs the scan as window.__manusScan so later calls only ship a short
+# invocation instead of the full source, and V8 parses it once per document.
+# Also tracks in window.__manusDirty whether the viewport may have changed
+# since the last scan (DOM mutation, edited form value, scroll or resize).
+_INSTALL_SCAN_JS = """(() => {
+    // Init scripts run in every frame, only the top document is ever scanned
+    if (window !== window.top || window.__manusScan) return;
+    window.__manusScan = """ + _SCAN_JS + """;
+    window.__manusDirty = true;
+    const markDirty = () => { window.__manusDirty = true; };
+    window.__manusObserver = new MutationObserver(markDirty);
+    window.__manusObserver.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    // Typing changes the value property of form fields without mutating the DOM
+    window.addEventListener('input', markDirty, {capture: true, passive: true});
+    window.addEventListener('change', markDirty, {capture: true, passive: true});
+    window.addEventListener('scroll', markDirty, {capture: true, passive: true});
+    window.addEventListener('resize', markDirty, {passive: true});
+})()"""
+
+# Returns null when the current document has no installed scan yet, and
+# {unchanged: true} when reuse is allowed and nothing changed since the last scan
+_CALL_SCAN_JS = """([withContent, reuse]) => {
+    if (!window.__manusScan) return null;
+    if (reuse && !window.__manusDirty) return {unchanged: true};
+    return window.__manusScan(withContent);
+}"""
+
+
+# For each selector, returns the viewport coordinates of the matching element
+# center and whether it can be clicked there, or null when it does not exist.
+# A single element is scrolled into view when needed; in bulk, scrolling to one
+# element would move the others, so elements outside the viewport are reported
+# as not visible instead. With focus set, elements are also focused with their
+# content selected, and focused reports whether they actually took focus.
+_RESOLVE_MANY_JS = """([selectors, focus]) => selectors.map((selector) => {
+    const element = document.querySelector(selector);
+    if (!element) return null;
+    let rect = element.getBoundingClientRect();
+    const style = window.getComputedStyle(element);
+    const visible = !(
+        rect.width === 0 || 
+        rect.height === 0 || 
+        style.display === 'none' || 
+        style.visibility === 'hidden' || 
+        style.opacity === '0'
+    );
+    // Coordinates are only usable for an element inside the viewport
+    let inViewport = (
+        rect.top >= 0 &&
+        rect.left >= 0 &&
+        rect.bottom <= window.innerHeight &&
+        rect.right <= window.innerWidth
+    );
+    if (selectors.length === 1 && (!visible || !inViewport)) {
+        element.scrollIntoView({block: 'center', inline: 'center'});
+        rect = element.getBoundingClientRect();
+        inViewport = true;
+    }
+    let focused = false;
+    if (focus) {
+        element.focus();
+        // Wrappers that only activate an editor on click cannot take focus
+        focused = element === document.activeElement || element.contains(document.activeElement);
+        if (typeof element.select === 'function') {
+            element.select();
+        } else if (element.isContentEditable) {
+            const range = document.createRange();
+            range.selectNodeContents(element);
+            const selection = window.getSelection();
+            selection.removeAllRanges();
+            selection.addRange(range);
+        }
+    }
+    return {x: rect.left + rect.width / 2, y: rect.top + rect.height / 2, visible: visible && inViewport, focused};
+})"""
+
+# Scroll the viewport by one screen or to either end of the document
+_SCROLL_TOP_JS = "window.scrollTo(0, 0)"
+_SCROLL_UP_JS = "window.scrollBy(0, -window.innerHeight)"
+_SCROLL_BOTTOM_JS = "window.scrollTo(0, document.body.scrollHeight)"
+_SCROLL_DOWN_JS = "window.scrollBy(0, window.innerHeight)"
+
+
 class PlaywrightBrowser:
     """Playwright client that provides specific implementation of browser operations
 
-    Important: when connecting to an external browser via CDP we MUST NOT close the
-    global browser instance because multiple sessions share it. Instead every
-    PlaywrightBrowser instance will create a dedicated BrowserContext and Page to
-    ensure isolation between sessions.
+    Important: the Playwright runtime and the CDP connection to the browser are
+    shared by all sessions using the same cdp_url and MUST NOT be closed by an
+    instance. Instead every PlaywrightBrowser instance creates a dedicated
+    BrowserContext and Page to ensure isolation between sessions.
+
+    When browser_context_pool_size is set, contexts of finished sessions are
+    kept idle (with cookies cleared) and handed to later sessions on the same
+    cdp_url instead of being closed.
     """
 
     def __init__(self, cdp_url: str):
         self.browser: Optional[Browser] = None
-        self.context = None
+        self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
-        self.playwright = None
-        self.llm = OpenAILLM()
+        self._console_logs: Deque[Dict[str, str]] = deque(maxlen=_MAX_CONSOLE_LOGS)
+        # Set by actions that may change the page without the scan noticing
+        # (e.g. scripts assigning form values), forces the next scan to run
+        self._page_changed = False
+        self.llm = _get_llm()
         self.settings = get_settings()
         self.cdp_url = cdp_url
-        # Flag indicating we connected over remote CDP (shared browser)
-        self._connected_over_cdp = False
         
     async def initialize(self):
         """Initialize and ensure resources are available
 
-        This will connect to the remote browser and create a fresh BrowserContext
-        and Page for this PlaywrightBrowser instance, ensuring per-session isolation.
+        This only connects to the remote browser. The dedicated BrowserContext and
+        Page that isolate this session are created lazily by _ensure_page, so idle
+        sessions do not pay for them.
         """
-        # Add retry logic
-        max_retries = 5
-        retry_delay = 1  # Initial wait 1 second
-        for attempt in range(max_retries):
-            try:
-                # Start Playwright runtime (needed for CDP connection)
-                self.playwright = await async_playwright().start()
-                # Connect to existing Chrome instance via CDP
-                self.browser = await self.playwright.chromium.connect_over_cdp(self.cdp_url)
-                self._connected_over_cdp = True
-
-                # Always create a dedicated BrowserContext for isolation
-                # (do NOT reuse browser.contexts[0])
-                self.context = await self.browser.new_context()
-                self.page = await self.context.new_page()
-
-                return True
-            except Exception as e:
-                # Clean up failed resources (only the context/page we may have created)
-                try:
-                    await self.cleanup()
-                except Exception:
-                    pass
-                
-                # Return error if maximum retry count is reached
-                if attempt == max_retries - 1:
-                    logger.error(f"Initialization failed (retried {max_retries} times): {e}")
-                    return False
-                
-                # Otherwise increase waiting time (exponential backoff strategy)
-                retry_delay = min(retry_delay * 2, 10)  # Maximum wait 10 seconds
-                logger.warning(f"Initialization failed, will retry in {retry_delay} seconds: {e}")
-                await asyncio.sleep(retry_delay)
+        try:
+            # Reuse the shared connection to the Chrome instance
+            self.browser = await _get_shared_browser(self.cdp_url)
+            return True
+        except Exception as e:
+            logger.error(f"Initialization failed: {e}")
+            return False
 
     async def cleanup(self):
         """Clean up Playwright resources
 
-        Only the per-instance BrowserContext and Page are closed. When connected
-        over CDP to a shared browser, we must NOT close the global browser or stop
-        the Playwright runtime because other sessions depend on it.
+        Only the per-instance BrowserContext and Page are closed, or the context
+        is returned to the idle pool when pooling is enabled. The shared browser
+        connection and Playwright runtime stay alive because other sessions
+        depend on them.
         """
+        if self.context is None:
+            # Nothing was allocated for this instance yet
+            self.page = None
+            return
         try:
-            # Close our dedicated page and context
-            if getattr(self, 'page', None) and not self.page.is_closed():
-                try:
-                    await self.page.close()
-                except Exception:
-                    logger.debug("Failed to close page, ignoring")
-            if getattr(self, 'context', None):
-                try:
-                    await self.context.close()
-                except Exception:
-                    logger.debug("Failed to close context, ignoring")
-
-            # If we did NOT connect over CDP (rare), we may own the browser and playwright
-            # In that case, try to close them as well. But if connected over CDP, leave the
-            # browser/process running.
-            if not getattr(self, '_connected_over_cdp', False):
-                try:
-                    if self.browser:
-                        await self.browser.close()
-                except Exception:
-                    logger.debug("Failed to close browser, ignoring")
-                try:
-                    if self.playwright:
-                        await self.playwright.stop()
-                except Exception:
-                    logger.debug("Failed to stop playwright, ignoring")
+            # Release the context, our dedicated page is closed along with it
+            # (by the context close, or before the context is pooled)
+            await _release_context(self.cdp_url, self.context, self.settings.browser_context_pool_size)
         except Exception as e:
             logger.error(f"Error occurred when cleaning up resources: {e}")
         finally:
             # Reset references
             self.page = None
             self.context = None
-            # Do NOT reset browser if connected over CDP; keep connection intact
-            if not getattr(self, '_connected_over_cdp', False):
-                self.browser = None
-                self.playwright = None
+            self._console_logs.clear()
     
     async def _ensure_browser(self):
-        """Ensure the browser is started"""
-        if not self.browser or not self.page:
+        """Ensure the browser is connected"""
+        if not self.browser or not self.browser.is_connected():
+            # A context from a dropped connection is unusable
+            self.context = None
+            self.page = None
             if not await self.initialize():
                 raise Exception("Unable to initialize browser resources")
     
     async def _ensure_page(self):
         """Ensure the page is created and valid for this instance"""
+        # Fast path for the common case of a live page, without awaiting anything
+        if self.page is not None and not self.page.is_closed() and self.browser.is_connected():
+            return self.page
+        try:
+            return await self._open_page()
+        except Exception as e:
+            if not _is_target_closed(e):
+                raise
+            # Retrying on a closed handle cannot succeed, replace it and start over once
+            logger.warning(f"Browser handle was closed, reopening: {e}")
+            if self.context is None:
+                # Creating the context failed, the shared connection is dead even
+                # though it still reports being connected
+                await _forget_browser(self.cdp_url, self.browser)
+                self.browser = None
+            self.context = None
+            self.page = None
+            return await self._open_page()
+
+    async def _open_page(self):
+        """Connect if needed and create the context and page that are missing"""
         await self._ensure_browser()
-        # If we don't have a dedicated context, create one
-        if not getattr(self, 'context', None):
-            self.context = await self.browser.new_context()
+        # Always use a dedicated BrowserContext for isolation
+        # (do NOT reuse browser.contexts[0]), either fresh or an idle pooled one.
+        # Each step is retried on its own so a page creation failure does not
+        # force a full CDP reconnect.
+        if self.context is None:
+            self.context = _acquire_pooled_context(self.cdp_url)
+        if self.context is None:
+            self.context = await _retry_with_backoff(self.browser.new_context)
         # If we don't have a page or it's closed, create a new page in our context
-        if not self.page or (self.page and getattr(self.page, 'is_closed', lambda: False)()):
-            self.page = await self.context.new_page()
+        if self.page is None or self.page.is_closed():
+            self.page = await _retry_with_backoff(self.context.new_page)
+            # Console output of a previous page does not belong to this one
+            self._console_logs.clear()
+            self.page.on("console", self._on_console)
+            await self._install_scan()
         return self.page
     
+    def _on_console(self, message: ConsoleMessage):
+        """Buffer a console message emitted by the page"""
+        self._console_logs.append({"type": message.type, "text": message.text})
+
+    async def _install_scan(self):
+        """Install the viewport scan function into every document loaded by the page"""
+        # Init scripts run on each new document, so navigations need no re-install
+        await self.page.add_init_script(_INSTALL_SCAN_JS)
+    
     async def wait_for_page_load(self, timeout: int = 15) -> bool:
         """Wait for the page to finish loading, waiting up to the specified timeout
         
@@ -143,86 +709,71 @@ class PlaywrightBrowser:
         """
         await self._ensure_page()
         
-        start_time = asyncio.get_event_loop().time()
-        check_interval = 5  # Check every 5 seconds
+        # Resolved by Chrome's lifecycle events, no polling of document.readyState
+        try:
+            await self.page.wait_for_load_state("load", timeout=timeout * 1000)
+            return True
+        except PlaywrightTimeoutError:
+            # Timeout, page loading not completed
+            return False
+    
+    async def _scan_page(self, with_content: bool = False) -> Optional[Dict[str, Any]]:
+        """Scan the current viewport in a single page round-trip and refresh the interactive elements cache
         
-        while asyncio.get_event_loop().time() - start_time < timeout:
-            # Check if the page has completely loaded
-            is_loaded = await self.page.evaluate("""() => {
-                return document.readyState === 'complete';
-            }""")
+        The scan is skipped when the page reports no DOM mutation, input, scroll or
+        resize since the last scan, no action was performed on the page through this
+        instance, and the caches the caller relies on are populated.
+        
+        Args:
+            with_content: Whether to also collect the HTML of visible elements
             
-            if is_loaded:
-                return True
-                
-            # Wait for a while before checking again
-            await asyncio.sleep(check_interval)
+        Returns:
+            Dict with "interactive" (element info list) and "content" (HTML or None),
+            or None when the cached results are still valid
+        """
+        await self._ensure_page()
         
-        # Timeout, page loading not completed
-        return False
+        reuse = not self._page_changed and bool(getattr(self.page, 'interactive_elements_cache', None))
+        if with_content:
+            reuse = reuse and getattr(self.page, 'page_content_cache', None) is not None
+        
+        scan = await self.page.evaluate(_CALL_SCAN_JS, [with_content, reuse])
+        if scan is None:
+            # Document loaded before the init script was registered (e.g. the initial blank page)
+            await self.page.evaluate(_INSTALL_SCAN_JS)
+            scan = await self.page.evaluate(_CALL_SCAN_JS, [with_content, False])
+        self._page_changed = False
+        if scan.get("unchanged"):
+            return None
+        
+        # Update cache, content extracted from the previous DOM is stale now
+        self.page.interactive_elements_cache = scan["interactive"]
+        self.page.page_content_cache = None
+        return scan
     
-    async def _extract_content(self) -> Dict[str, Any]:
-        """Extract content from the current page"""
-
-        # Execute JavaScript to get elements in the viewport    
-        visible_content = await self.page.evaluate("""() => {
-            const visibleElements = [];
-            const viewportHeight = window.innerHeight;
-            const viewportWidth = window.innerWidth;
-            
-            // Get all potentially relevant elements
-            const elements = document.querySelectorAll('body *');
-            
-            for (const element of elements) {
-                // Check if the element is in the viewport and visible
-                const rect = element.getBoundingClientRect();
-                
-                // Element must have some dimensions
-                if (rect.width === 0 || rect.height === 0) continue;
-                
-                // Element must be within the viewport
-                if (
-                    rect.bottom < 0 || 
-                    rect.top > viewportHeight ||
-                    rect.right < 0 || 
-                    rect.left > viewportWidth
-                ) continue;
-                
-                // Check if the element is visible (not hidden by CSS)
-                const style = window.getComputedStyle(element);
-                if (
-                    style.display === 'none' || 
-                    style.visibility === 'hidden' || 
-                    style.opacity === '0'
-                ) continue;
-                
-                // If it's a text node or meaningful element, add it to the results
-                if (
-                    element.innerText || 
-                    element.tagName === 'IMG' || 
-                    element.tagName === 'INPUT' || 
-                    element.tagName === 'BUTTON'
-                ) {
-                    visibleElements.push(element.outerHTML);
-                }
-            }
-            
-            // Build HTML containing these visible elements
-            return '<div>' + visibleElements.join('') + '</div>';
-        }""")
-
+    @staticmethod
+    def _format_interactive_elements(interactive_elements: List[Dict[str, Any]]) -> List[str]:
+        """Format element information as index:<tag>text</tag>"""
+        return [f"{el['index']}:<{el['tag']}>{el['text']}</{el['tag']}>" for el in interactive_elements]
+    
+    async def _extract_content(self, visible_content: str) -> str:
+        """Extract content from the visible HTML of the current page"""
+        # Only a prefix of the Markdown reaches the LLM, so don't convert HTML that
+        # would be discarded. Cut before a tag start so no tag is split in half.
+        if len(visible_content) > _MAX_HTML_LENGTH:
+            cut = visible_content.rfind('<', 0, _MAX_HTML_LENGTH)
+            visible_content = visible_content[:cut if cut > 0 else _MAX_HTML_LENGTH]
         
-        # Convert to Markdown
-        markdown_content = markdownify(visible_content)
+        # Convert to Markdown in a worker thread so the event loop stays responsive
+        markdown_content = await asyncio.to_thread(_html_to_markdown, visible_content)
 
-        max_content_length = min(50000, len(markdown_content))
         response = await self.llm.ask([{
             "role": "system",
             "content": "You are a professional web page information extraction assistant. Please extract all information from the current page content and convert it to Markdown format."
         },
         {
             "role": "user",
-            "content": markdown_content[:max_content_length]
+            "content": markdown_content[:_MAX_MARKDOWN_LENGTH]
         }
         ])
         
@@ -235,174 +786,24 @@ class PlaywrightBrowser:
         # Wait for the page to load completely, maximum wait 15 seconds
         await self.wait_for_page_load()
         
-        # First update the interactive elements cache
-        interactive_elements = await self._extract_interactive_elements()
+        # Interactive elements and visible content come from the same DOM pass,
+        # an unchanged page reuses the previous extraction
+        scan = await self._scan_page(with_content=True)
+        if scan is not None:
+            self.page.page_content_cache = await self._extract_content(scan["content"])
         
         return ToolResult(
             success=True,
             data={
-                "interactive_elements": interactive_elements,
-                "content": await self._extract_content(),
+                "interactive_elements": self._format_interactive_elements(self.page.interactive_elements_cache),
+                "content": self.page.page_content_cache,
             }
         )
     
     async def _extract_interactive_elements(self) -> List[str]:
         """Return a list of visible interactive elements on the page, formatted as index:<tag>text</tag>"""
-        await self._ensure_page()
-        
-        # Clear the current page's cache to ensure we always get the latest list of elements
-        self.page.interactive_elements_cache = []
-        
-        # Execute JavaScript to get interactive elements in the viewport
-        interactive_elements = await self.page.evaluate("""() => {
-            const interactiveElements = [];
-            const viewportHeight = window.innerHeight;
-            const viewportWidth = window.innerWidth;
-            
-            // Get all potentially relevant interactive elements
-            const elements = document.querySelectorAll('button, a, input, textarea, select, [role="button"], [tabindex]:not([tabindex="-1"])');
-            
-            let validElementIndex = 0; // For generating consecutive indices
-            
-            for (let i = 0; i < elements.length; i++) {
-                const element = elements[i];
-                // Check if the element is in the viewport and visible
-                const rect = element.getBoundingClientRect();
-                
-                // Element must have some dimensions
-                if (rect.width === 0 || rect.height === 0) continue;
-                
-                // Element must be within the viewport
-                if (
-                    rect.bottom < 0 || 
-                    rect.top > viewportHeight ||
-                    rect.right < 0 || 
-                    rect.left > viewportWidth
-                ) continue;
-                
-                // Check if the element is visible (not hidden by CSS)
-                const style = window.getComputedStyle(element);
-                if (
-                    style.display === 'none' || 
-                    style.visibility === 'hidden' || 
-                    style.opacity === '0'
-                ) continue;
-                
-                
-                // Get element type and text
-                let tagName = element.tagName.toLowerCase();
-                let text = '';
-                
-                if (element.value && ['input', 'textarea', 'select'].includes(tagName)) {
-                    text = element.value;
-                    
-                    // Add label and placeholder information for input elements
-                    if (tagName === 'input') {
-                        // Get associated label text
-                        let labelText = '';
-                        if (element.id) {
-                            const label = document.querySelector(`label[for="${element.id}"]`);
-                            if (label) {
-                                labelText = label.innerText.trim();
-                            }
-                        }
-                        
-                        // Look for parent or sibling label
-                        if (!labelText) {
-                            const parentLabel = element.closest('label');
-                            if (parentLabel) {
-                                labelText = parentLabel.innerText.trim().replace(element.value, '').trim();
-                            }
-                        }
-                        
-                        // Add label information
-                        if (labelText) {
-                            text = `[Label: ${labelText}] ${text}`;
-                        }
-                        
-                        // Add placeholder information
-                        if (element.placeholder) {
-                            text = `${text} [Placeholder: ${element.placeholder}]`;
-                        }
-                    }
-                } else if (element.innerText) {
-                    text = element.innerText.trim().replace(/\\s+/g, ' ');
-                } else if (element.alt) { // For image buttons
-                    text = element.alt;
-                } else if (element.title) { // For elements with title
-                    text = element.title;
-                } else if (element.placeholder) { // For placeholder text
-                    text = `[Placeholder: ${element.placeholder}]`;
-                } else if (element.type) { // For input type
-                    text = `[${element.type}]`;
-                    
-                    // Add label and placeholder information for text-less input elements
-                    if (tagName === 'input') {
-                        // Get associated label text
-                        let labelText = '';
-                        if (element.id) {
-                            const label = document.querySelector(`label[for="${element.id}"]`);
-                            if (label) {
-                                labelText = label.innerText.trim();
-                            }
-                        }
-                        
-                        // Look for parent or sibling label
-                        if (!labelText) {
-                            const parentLabel = element.closest('label');
-                            if (parentLabel) {
-                                labelText = parentLabel.innerText.trim();
-                            }
-                        }
-                        
-                        // Add label information
-                        if (labelText) {
-                            text = `[Label: ${labelText}] ${text}`;
-                        }
-                        
-                        // Add placeholder information
-                        if (element.placeholder) {
-                            text = `${text} [Placeholder: ${element.placeholder}]`;
-                        }
-                    }
-                } else {
-                    text = '[No text]';
-                }
-                
-                // Maximum limit on text length to keep it clear
-                if (text.length > 100) {
-                    text = text.substring(0, 97) + '...';
-                }
-                
-                // Only add data-manus-id attribute to elements that meet the conditions
-                element.setAttribute('data-manus-id', `manus-element-${validElementIndex}`);
-                                                        
-                // Build selector - using only data-manus-id
-                const selector = `[data-manus-id="manus-element-${validElementIndex}"]`;
-                
-                // Add element information to the array
-                interactiveElements.push({
-                    index: validElementIndex,  // Use consecutive index
-                    tag: tagName,
-                    text: text,
-                    selector: selector
-                });
-                
-                validElementIndex++; // Increment valid element counter
-            }
-            
-            return interactiveElements;
-        }""")
-        
-        # Update cache
-        self.page.interactive_elements_cache = interactive_elements
-        
-        # Format element information in specified format
-        formatted_elements = []
-        for el in interactive_elements:
-            formatted_elements.append(f"{el['index']}:<{el['tag']}>{el['text']}</{el['tag']}>")
-        
-        return formatted_elements
+        await self._scan_page()
+        return self._format_interactive_elements(self.page.interactive_elements_cache)
     
     async def navigate(self, url: str, timeout: Optional[int] = 15000) -> ToolResult:
         """Navigate to the specified URL
@@ -451,6 +852,30 @@ class PlaywrightBrowser:
         selector = f'[data-manus-id="manus-element-{index}"]'
         return await self.page.query_selector(selector)
     
+    async def _resolve_many(self, indices: List[int], focus: bool = False) -> List[Optional[Dict[str, Any]]]:
+        """Resolve elements by index and prepare them for interaction in one page round-trip
+        
+        A single element is scrolled into view when needed. For inputs, elements
+        are focused with their current value selected so typing replaces it.
+        
+        Args:
+            indices: Element indices
+            focus: Whether to focus the elements and select their content
+            
+        Returns:
+            For each index, a dict with the viewport coordinates of the element
+            center (x, y), whether it can be clicked there (visible) and, with
+            focus, whether it took focus (focused), or None if not found
+        """
+        cache = getattr(self.page, 'interactive_elements_cache', None) or []
+        known = [index for index in indices if index < len(cache)]
+        if not known:
+            return [None] * len(indices)
+        
+        selectors = [f'[data-manus-id="manus-element-{index}"]' for index in known]
+        targets = dict(zip(known, await self.page.evaluate(_RESOLVE_MANY_JS, [selectors, focus])))
+        return [targets.get(index) for index in indices]
+    
     async def click(
         self,
         index: Optional[int] = None,
@@ -459,40 +884,20 @@ class PlaywrightBrowser:
     ) -> ToolResult:
         """Click an element"""
         await self._ensure_page()
+        self._page_changed = True
         if coordinate_x is not None and coordinate_y is not None:
             await self.page.mouse.click(coordinate_x, coordinate_y)
         elif index is not None:
             try:
-                element = await self._get_element_by_index(index)
-                if not element:
+                target = (await self._resolve_many([index]))[0]
+                if not target:
                     return ToolResult(success=False, message=f"Cannot find interactive element with index {index}")
                 
-                # Check if the element is visible
-                is_visible = await self.page.evaluate("""(element) => {
-                    if (!element) return false;
-                    const rect = element.getBoundingClientRect();
-                    const style = window.getComputedStyle(element);
-                    return !(
-                        rect.width === 0 || 
-                        rect.height === 0 || 
-                        style.display === 'none' || 
-                        style.visibility === 'hidden' || 
-                        style.opacity === '0'
-                    );
-                }""", element)
-                
-                if not is_visible:
-                    # Try to scroll to the element position
-                    await self.page.evaluate("""(element) => {
-                        if (element) {
-                            element.scrollIntoView({behavior: 'smooth', block: 'center'});
-                        }
-                    }""", element)
-                    # Wait for the element to become visible
-                    await asyncio.sleep(1)
-                
-                # Try to click the element
-                await element.click(timeout=5000)
+                if target["visible"]:
+                    await self.page.mouse.click(target["x"], target["y"])
+                else:
+                    # Let Playwright wait until the element is visible, stable and receives events
+                    await self.page.locator(f'[data-manus-id="manus-element-{index}"]').click(timeout=5000)
             except Exception as e:
                 return ToolResult(success=False, message=f"Failed to click element: {str(e)}")
         return ToolResult(success=True)
@@ -507,23 +912,36 @@ class PlaywrightBrowser:
     ) -> ToolResult:
         """Input text"""
         await self._ensure_page()
+        self._page_changed = True
         if coordinate_x is not None and coordinate_y is not None:
             await self.page.mouse.click(coordinate_x, coordinate_y)
             await self.page.keyboard.type(text)
         elif index is not None:
             try:
-                element = await self._get_element_by_index(index)
-                if not element:
+                target = (await self._resolve_many([index], focus=True))[0]
+                if not target:
                     return ToolResult(success=False, message=f"Cannot find interactive element with index {index}")
                 
-                # Try to use fill() method, but catch possible errors
-                try:
-                    await element.fill("")
-                    await element.type(text)
-                except Exception as e:
-                    # If fill() fails, use type() method directly
-                    await element.click()
+                locator = self.page.locator(f'[data-manus-id="manus-element-{index}"]')
+                if target["visible"] and target["focused"]:
+                    # The current value is selected, typing replaces it
+                    if text:
+                        await self.page.keyboard.type(text)
+                    else:
+                        await self.page.keyboard.press("Backspace")
+                elif target["visible"]:
+                    # The element did not take focus (e.g. a wrapper activating an
+                    # editor on click), click it like a user would and type
+                    await self.page.mouse.click(target["x"], target["y"])
                     await self.page.keyboard.type(text)
+                else:
+                    try:
+                        # Let Playwright wait until the element is editable, then replace its value
+                        await locator.fill(text, timeout=5000)
+                    except Exception:
+                        # Not an editable element, click it and type
+                        await locator.click(timeout=5000)
+                        await self.page.keyboard.type(text)
             except Exception as e:
                 return ToolResult(success=False, message=f"Failed to input text: {str(e)}")
         
@@ -544,6 +962,7 @@ class PlaywrightBrowser:
     async def press_key(self, key: str) -> ToolResult:
         """Simulate key press"""
         await self._ensure_page()
+        self._page_changed = True
         await self.page.keyboard.press(key)
         return ToolResult(success=True)
     
@@ -554,6 +973,7 @@ class PlaywrightBrowser:
     ) -> ToolResult:
         """Select dropdown option"""
         await self._ensure_page()
+        self._page_changed = True
         try:
             element = await self._get_element_by_index(index)
             if not element:
@@ -572,9 +992,9 @@ class PlaywrightBrowser:
         """Scroll up"""
         await self._ensure_page()
         if to_top:
-            await self.page.evaluate("window.scrollTo(0, 0)")
+            await self.page.evaluate(_SCROLL_TOP_JS)
         else:
-            await self.page.evaluate("window.scrollBy(0, -window.innerHeight)")
+            await self.page.evaluate(_SCROLL_UP_JS)
         return ToolResult(success=True)
     
     async def scroll_down(
@@ -584,46 +1004,71 @@ class PlaywrightBrowser:
         """Scroll down"""
         await self._ensure_page()
         if to_bottom:
-            await self.page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            await self.page.evaluate(_SCROLL_BOTTOM_JS)
         else:
-            await self.page.evaluate("window.scrollBy(0, window.innerHeight)")
+            await self.page.evaluate(_SCROLL_DOWN_JS)
         return ToolResult(success=True)
     
     async def screenshot(
         self,
-        full_page: Optional[bool] = False
+        full_page: Optional[bool] = False,
+        image_format: Optional[str] = None
     ) -> bytes:
         """Take a screenshot of the current page
         
         Args:
             full_page: Whether to capture the full page or just the viewport
+            image_format: "jpeg", "png" or "webp". Defaults to JPEG for the viewport,
+                which is several times smaller than PNG, and PNG for the full page
             
         Returns:
-            bytes: PNG screenshot data
+            bytes: Encoded screenshot data
         """
         await self._ensure_page()
         
+        if image_format is None:
+            image_format = "png" if full_page else "jpeg"
+        
+        if image_format == "webp":
+            return await self._capture_webp(full_page)
+        
         # Configure screenshot options
         screenshot_options = {
             "full_page": full_page,
-            "type": "png"
+            "type": image_format
         }
+        if image_format == "jpeg":
+            screenshot_options["quality"] = 80
         
         # Return bytes data directly
         return await self.page.screenshot(**screenshot_options)
     
+    async def _capture_webp(self, full_page: bool) -> bytes:
+        """Capture a WebP screenshot through CDP, Playwright itself only encodes PNG and JPEG"""
+        cdp_session = await self.context.new_cdp_session(self.page)
+        try:
+            params = {"format": "webp", "quality": 80}
+            if full_page:
+                metrics = await cdp_session.send("Page.getLayoutMetrics")
+                size = metrics["cssContentSize"]
+                params["captureBeyondViewport"] = True
+                params["clip"] = {"x": 0, "y": 0, "width": size["width"], "height": size["height"], "scale": 1}
+            result = await cdp_session.send("Page.captureScreenshot", params)
+        finally:
+            await cdp_session.detach()
+        return base64.b64decode(result["data"])
+    
     async def console_exec(self, javascript: str) -> ToolResult:
         """Execute JavaScript code"""
         await self._ensure_page()
+        self._page_changed = True
         result = await self.page.evaluate(javascript)
         return ToolResult(success=True, data={"result": result})
     
     async def console_view(self, max_lines: Optional[int] = None) -> ToolResult:
         """View console output"""
-        await self._ensure_page()
-        logs = await self.page.evaluate("""() => {
-            return window.console.logs || [];
-        }""")
+        # Messages are buffered by the page's console listener, no page round-trip needed
+        logs = list(self._console_logs)
         if max_lines is not None:
             logs = logs[-max_lines:]
         return ToolResult(success=True, data={"logs": logs})
@@ -1,23 +1,209 @@
 from typing import List, Dict, Any, Optional
-from openai import AsyncOpenAI, BadRequestError
+from openai import APIStatusError, AsyncOpenAI, BadRequestError, DefaultAsyncHttpxClient, RateLimitError
 from app.domain.external.llm import LLM
 from app.core.config import get_settings
+from app.infrastructure.utils.backoff import backoff_delay
+from app.infrastructure.utils.circuit_breaker import get_circuit_breaker
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from datetime import datetime, timezone
 import logging
 import asyncio
+import copy
+import hashlib
+import httpx
+import json
+import random
+import re
 import time
 
 
 logger = logging.getLogger(__name__)
 
+# Durations used by x-ratelimit-reset-* headers, e.g. "20ms", "1.5s", "6m0s"
+_DURATION_PART_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# HTTP statuses worth retrying, other client errors will not succeed on retry
+_RETRIABLE_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Completion token limits stated in max_tokens errors, e.g.
+# "supports at most 4096 completion tokens", "valid range of max_tokens is [1, 8192]"
+_MAX_TOKENS_LIMIT_RE = re.compile(
+    r'reduce\s+(?:your\s+)?max[_ ]tokens\s+to\s+(\d+)'
+    r'|at\s+most\s+(\d+)\s+completion\s+tokens'
+    r'|valid\s+range\s+of\s+max_tokens\s+is\s+\[\d+,\s*(\d+)\]',
+    re.I,
+)
+# "maximum context length is 8192 tokens. However, you requested ... (2000 in the messages, ..."
+_CONTEXT_LIMIT_RE = re.compile(
+    r'maximum\s+context\s+length\s+is\s+(\d+).*?(\d+)\s+in\s+the\s+messages',
+    re.I | re.S,
+)
+
+
+def _parse_max_tokens_limit(error_msg: str) -> Optional[int]:
+    """Get the largest max_tokens the server accepts from a max_tokens error, if stated
+
+    Args:
+        error_msg: Error message of the rejected request
+
+    Returns:
+        Largest accepted max_tokens, or None if the message does not say
+    """
+    match = _MAX_TOKENS_LIMIT_RE.search(error_msg)
+    if match:
+        return int(next(group for group in match.groups() if group))
+    match = _CONTEXT_LIMIT_RE.search(error_msg)
+    if match:
+        # The completion has to fit in what the prompt leaves of the context
+        remaining = int(match.group(1)) - int(match.group(2))
+        if remaining > 0:
+            return remaining
+    return None
+
+
+def _parse_retry_after(headers) -> Optional[float]:
+    """Get the wait time (seconds) requested by a rate limit response, if any
+
+    Args:
+        headers: Response headers
+
+    Returns:
+        Seconds to wait before retrying, or None if the response does not say
+    """
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+        # Retry-After may also be an HTTP date
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+
+    reset = headers.get("x-ratelimit-reset-requests") or headers.get("x-ratelimit-reset-tokens")
+    if reset:
+        parts = _DURATION_PART_RE.findall(reset)
+        if parts:
+            return sum(float(value) * _DURATION_UNITS[unit] for value, unit in parts)
+
+    return None
+
+
+@lru_cache()
+def _get_client(api_key: Optional[str], base_url: str) -> AsyncOpenAI:
+    """Get the AsyncOpenAI client shared by all OpenAILLM instances for an endpoint
+
+    One client means one HTTP/2 connection pool, so concurrent requests are
+    multiplexed over warm connections instead of each instance opening its own.
+    """
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        # OpenAILLM.ask owns the retry policy, SDK retries would multiply it
+        max_retries=0,
+        http_client=DefaultAsyncHttpxClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        ),
+    )
+
+
+class _RetryTokenBucket:
+    """Client-side retry quota
+
+    Every retry spends one token and every successful request refills a
+    fraction of one. While the upstream keeps failing the bucket drains and
+    requests fail fast instead of all running their full backoff series;
+    successes gradually restore the quota.
+    """
+
+    def __init__(self, capacity: float = 10.0, refill: float = 0.1):
+        self._capacity = capacity
+        self._refill = refill
+        self._tokens = capacity
+
+    def acquire(self) -> bool:
+        """Spend a token for a retry, returns False when none is left"""
+        # Single event loop, no await in between: no lock needed
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def refill(self):
+        """Return part of a token after a successful request"""
+        self._tokens = min(self._capacity, self._tokens + self._refill)
+
+
+class _ResponseCache:
+    """In-memory LRU of LLM responses with a time to live"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: "OrderedDict[bytes, tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: bytes, value: Dict[str, Any]):
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+
+@lru_cache()
+def _get_response_cache(maxsize: int, ttl: float) -> _ResponseCache:
+    """Get the response cache shared by all OpenAILLM instances"""
+    return _ResponseCache(maxsize, ttl)
+
+
+# Requests currently sent upstream, so identical concurrent requests share one call
+_INFLIGHT: Dict[bytes, "asyncio.Task[Dict[str, Any]]"] = {}
+
 
 class OpenAILLM(LLM):
+    # Upper bound for a single retry backoff (seconds). Rate limits resetting
+    # later than this fail the request instead of being waited out.
+    MAX_RETRY_DELAY = 10.0
+
+    # Retry quota shared by all instances, they all talk to the same upstream
+    _retry_tokens = _RetryTokenBucket()
+
     def __init__(self):
         settings = get_settings()
-        self.client = AsyncOpenAI(api_key=settings.api_key, base_url=settings.api_base)
+        self.client = _get_client(settings.api_key, settings.api_base)
+        self._circuit = get_circuit_breaker(settings.api_base)
 
         self._model_name = settings.model_name
         self._temperature = settings.temperature
         self._max_tokens = settings.max_tokens
+        self._response_cache = (
+            _get_response_cache(settings.llm_cache_size, settings.llm_cache_ttl_seconds)
+            if settings.llm_cache_size > 0 else None
+        )
         logger.info(f"Initialized OpenAI LLM with model: {self._model_name}")
 
     @property
@@ -38,19 +224,98 @@ class OpenAILLM(LLM):
         tools: Optional[List[Dict[str, Any]]] = None,
         response_format: Optional[Dict[str, Any]] = None,
         tool_choice: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Send chat request to OpenAI API
+
+        When the response cache is enabled (llm_cache_size), responses to
+        identical requests are served from memory and identical concurrent
+        requests share a single upstream call.
+        """
+        if self._response_cache is None:
+            return await self._ask(messages, tools, response_format, tool_choice)
+
+        key = self._cache_key(messages, tools, response_format, tool_choice)
+        cached = self._response_cache.get(key)
+        if cached is not None:
+            logger.debug("Serving OpenAI response from cache")
+            return copy.deepcopy(cached)
+
+        task = _INFLIGHT.get(key)
+        if task is None:
+            # The upstream call runs in its own task, so it does not belong to (and
+            # is not cancelled with) the session that happened to start it
+            task = asyncio.create_task(self._ask_and_cache(key, messages, tools, response_format, tool_choice))
+            _INFLIGHT[key] = task
+            task.add_done_callback(lambda t: _INFLIGHT.pop(key, None))
+            # Waiters may be gone by the time the call fails, don't warn about it
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        else:
+            logger.debug("Waiting for identical in-flight OpenAI request")
+        # Shielded so a cancelled caller does not cancel the request for the others
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def _ask_and_cache(
+        self,
+        key: bytes,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, Any]]],
+        response_format: Optional[Dict[str, Any]],
+        tool_choice: Optional[str],
+    ) -> Dict[str, Any]:
+        """Send a request upstream and cache its response"""
+        result = await self._ask(messages, tools, response_format, tool_choice)
+        self._response_cache.set(key, result)
+        return result
+
+    def _cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, Any]]],
+        response_format: Optional[Dict[str, Any]],
+        tool_choice: Optional[str],
+    ) -> bytes:
+        """Build the response cache key of a request"""
+        payload = json.dumps(
+            [self._model_name, self._temperature, self._max_tokens, messages, tools, response_format, tool_choice],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode()).digest()
+
+    async def _ask(
+        self,
+        messages: List[Dict[str, str]],
+        tools: Optional[List[Dict[str, Any]]] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+        tool_choice: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Send chat request to OpenAI API with retry mechanism and intelligent max_tokens adjustment"""
         max_retries = 4
-        base_delay = 1.0
+        base_delay = 0.25
         max_tokens = self._max_tokens
 
+        retry_after = None  # wait time requested by the server for the next attempt
+        last_error = None
+
         for attempt in range(max_retries + 1):  # every try
             response = None
+            if attempt > 0 and not self._retry_tokens.acquire():
+                logger.error("OpenAI API retry quota exhausted, failing without retrying")
+                raise last_error
+            # Fail fast while the API is known to be down
+            self._circuit.before()
             try:
                 if attempt > 0:
-                    delay = base_delay * (2 ** (attempt - 1))  # back off
+                    if retry_after is not None:
+                        # Honor the server's rate limit reset time, with a little jitter
+                        # so callers given the same reset time do not retry in lockstep
+                        delay = retry_after + random.uniform(0, 0.5)
+                        retry_after = None
+                    else:
+                        # Capped exponential backoff with +/-50% jitter
+                        delay = backoff_delay(attempt - 1, base_delay, self.MAX_RETRY_DELAY)
                     logger.info(
-                        f"Retrying OpenAI API request (attempt {attempt + 1}/{max_retries + 1}) after {delay}s delay"
+                        f"Retrying OpenAI API request (attempt {attempt + 1}/{max_retries + 1}) after {delay:.2f}s delay"
                     )
                     await asyncio.sleep(delay)
 
@@ -80,28 +345,33 @@ class OpenAILLM(LLM):
                         response_format=response_format,
                     )
 
-                logger.debug(f"Response from OpenAI: {response.model_dump()}")
-
-                if not response or not response.choices:
-                    error_msg = f"OpenAI API returned invalid response (no choices) on attempt {attempt + 1}"
-                    logger.error(error_msg)
-                    if attempt == max_retries:
-                        raise ValueError(
-                            f"Failed after {max_retries + 1} attempts: {error_msg}"
-                        )
-                    continue
-
-                return response.choices[0].message.model_dump()
-
+            except RateLimitError as e:
+                last_error = e
+                retry_after = _parse_retry_after(e.response.headers)
+                logger.warning(
+                    f"Rate limited by OpenAI API on attempt {attempt + 1}, retry after: {retry_after}s. Error: {str(e)}"
+                )
+                if attempt == max_retries:
+                    raise e
+                if retry_after is not None and retry_after > self.MAX_RETRY_DELAY:
+                    # Retrying before the stated time would only be rate limited again
+                    logger.error(f"OpenAI API rate limit resets in {retry_after}s, failing without retrying")
+                    raise e
+                continue
             except BadRequestError as e:
+                last_error = e
                 # Handle max_tokens too large error
                 error_msg = str(e)
                 if (
                     "max_tokens" in error_msg.lower()
                     or "too large" in error_msg.lower()
                 ):
-                    # Reduce max_tokens by half and retry
-                    new_max_tokens = max(512, max_tokens // 2)
+                    # Jump to the limit stated by the server, or halve max_tokens
+                    limit = _parse_max_tokens_limit(error_msg)
+                    if limit is not None and limit < max_tokens:
+                        new_max_tokens = limit
+                    else:
+                        new_max_tokens = max(512, max_tokens // 2)
                     logger.warning(
                         f"max_tokens ({max_tokens}) is too large. Reducing to {new_max_tokens} and retrying. Error: {error_msg}"
                     )
@@ -114,13 +384,26 @@ class OpenAILLM(LLM):
                         )
                         raise e
                 else:
+                    # The same request would be rejected again
                     logger.error(
                         f"BadRequestError on attempt {attempt + 1}: {error_msg}"
                     )
-                    if attempt == max_retries:
-                        raise e
-                    continue
+                    raise e
+            except APIStatusError as e:
+                last_error = e
+                if e.status_code not in _RETRIABLE_STATUS:
+                    logger.error(f"OpenAI API request rejected with status {e.status_code}: {str(e)}")
+                    raise e
+                # Server errors, the API may be down
+                self._circuit.record_failure()
+                logger.error(f"Error calling OpenAI API on attempt {attempt + 1}: {str(e)}")
+                if attempt == max_retries:
+                    raise e
+                continue
             except Exception as e:
+                last_error = e
+                # Transport errors, the API may be down
+                self._circuit.record_failure()
                 error_msg = (
                     f"Error calling OpenAI API on attempt {attempt + 1}: {str(e)}"
                 )
@@ -128,3 +411,23 @@ class OpenAILLM(LLM):
                 if attempt == max_retries:
                     raise e
                 continue
+
+            # Dumping the whole response is costly, only do it when it gets logged
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Response from OpenAI: {response.model_dump_json()}")
+
+            # Checked outside the try, its handlers would record the failure a second time
+            if not response or not response.choices:
+                error_msg = f"OpenAI API returned invalid response (no choices) on attempt {attempt + 1}"
+                logger.error(error_msg)
+                last_error = ValueError(error_msg)
+                self._circuit.record_failure()
+                if attempt == max_retries:
+                    raise ValueError(
+                        f"Failed after {max_retries + 1} attempts: {error_msg}"
+                    )
+                continue
+
+            self._retry_tokens.refill()
+            self._circuit.record_success()
+            return response.choices[0].message.model_dump()
@@ -4,6 +4,7 @@ import logging
 
 from app.domain.external.search import SearchEngine
 from app.core.config import get_settings
+from app.infrastructure.external.cache import get_cache
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +30,7 @@ def get_search_engine() -> Optional[SearchEngine]:
         return BaiduSearchEngine()
     elif settings.search_provider == "bing":
         logger.info("Initializing Bing Search Engine")
-        return BingSearchEngine()
+        return BingSearchEngine(cache=get_cache(), cache_ttl=settings.search_cache_ttl_seconds)
     else:
         logger.warning(f"Unknown search provider: {settings.search_provider}")
     
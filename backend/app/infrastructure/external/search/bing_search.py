@@ -1,16 +1,51 @@
-from typing import Optional
+from typing import Dict, Optional, Tuple
+import asyncio
+import hashlib
 import logging
 import httpx
 import re
-from urllib.parse import quote
-from bs4 import BeautifulSoup
+from urllib.parse import quote, urljoin
+from lxml import etree, html as lxml_html
 from app.domain.models.tool_result import ToolResult
 from app.domain.models.search import SearchResults, SearchResultItem
 from app.domain.external.search import SearchEngine
+from app.domain.external.cache import Cache
+from app.infrastructure.utils.backoff import backoff_delay
+from app.infrastructure.utils.circuit_breaker import get_circuit_breaker
 
 logger = logging.getLogger(__name__)
 
-
+# Patterns used while parsing result pages, compiled once
+_SENTENCE_RE = re.compile(r'[^。！？\n]+')
+# XPath queries run in libxml2, only matched nodes are handed to Python.
+# Bing search results are li elements with class 'b_algo' or 'b_algoGroup' (兼容中文结果的class)
+_RESULT_ITEMS = etree.XPath(
+    "//li[contains(concat(' ', normalize-space(@class), ' '), ' b_algo ')"
+    " or contains(concat(' ', normalize-space(@class), ' '), ' b_algoGroup ')]"
+)
+# First link of the first heading, the title is usually in h2 > a (兼容中文结果的结构)
+_TITLE_LINK = etree.XPath("(.//h2)[1]/descendant::a[1]")
+_ABSOLUTE_LINKS = etree.XPath(".//a[starts-with(@href, 'http')]")
+_SNIPPETS = etree.XPath(
+    ".//*[self::p or self::div][re:test(@class, 'b_lineclamp[0-9]+|b_descript|b_caption|b_snippet')]",
+    namespaces={'re': 'http://exslt.org/regular-expressions'},
+)
+_PARAGRAPHS = etree.XPath(".//p")
+# Text of the result count label above the results
+_TOTAL_RESULTS_TEXT = etree.XPath("string((//*[self::span or self::div][contains(@class, 'sb_count')])[1])", smart_strings=False)
+# Text nodes as shown on the page, script and style contents are left out
+_TEXT_NODES = etree.XPath(".//text()[not(ancestor::script or ancestor::style)]", smart_strings=False)
+# Result count label, e.g. "About 1,230,000 results" or "约 1,230,000 个结果"
+_TOTAL_RESULTS_RE = re.compile(r'(\d[\d,，]*)\s*(?:个\s*)?(?:results?|条|结果)', re.I)
+# Throttling and gateway errors worth retrying, other status errors fail right away
+_RETRIABLE_STATUS = {429, 502, 503, 504}
+# Markers of Bing's bot verification page, matched against the raw HTML
+_ANTIBOT_RE = re.compile(r'unusual traffic|please verify you.?re a human|验证码|检测到异常|访问受限', re.I)
+
+
+def _text(element) -> str:
+    """Text of an element with each text node stripped, as on the rendered page"""
+    return ''.join(text.strip() for text in _TEXT_NODES(element))
 
 
 # --- Implementation ---
@@ -18,8 +53,27 @@ logger = logging.getLogger(__name__)
 class BingSearchEngine(SearchEngine):
     """Bing web search engine implementation using web scraping"""
 
-    def __init__(self):
-        """Initialize Bing search engine with Chinese settings"""
+    MAX_RETRIES = 3
+    MAX_RETRY_DELAY = 10.0
+
+    def __init__(
+            self,
+            max_results: int = 20,
+            cache: Optional[Cache] = None,
+            cache_ttl: int = 120,
+            max_concurrency: int = 32
+    ):
+        """Initialize Bing search engine with Chinese settings
+
+        Args:
+            max_results: Maximum number of results extracted from a result page
+            cache: Cache shared across sessions for results of identical searches
+            cache_ttl: Seconds a cached search result is reused, 0 disables caching
+            max_concurrency: Maximum number of requests sent to Bing at the same time
+        """
+        self.max_results = max_results
+        self._cache = cache if cache_ttl > 0 else None
+        self._cache_ttl = cache_ttl
         self.base_url = "https://www.bing.com/search"
         self.headers = {
             # 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36',
@@ -27,17 +81,193 @@ class BingSearchEngine(SearchEngine):
             
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1',
             # 增强中文语境标识
             'Referer': 'https://www.bing.com/',
             'DNT': '1',
-            "Cookie": "MUID=1FEFFAC1218D606613B4E86E258D6609; MUIDB=1FEFFAC1218D606613B4E86E258D6609; SRCHD=AF=CHROMN; SRCHUID=V=2&GUID=2F3595FAE88E440599D6689FF0ECE3D1&dmnchg=1; _Rwho=u=d&ts=2026-01-23; _FP=hta=on; _UR=QS=0&TQS=0&Pn=0; BFBUSR=BFBHP=0; BFPRResults=FirstPageUrls=DEA1E832374B86232FB7C40343F01C2C%2CEF905FAA8FBD8FB13A8BB9950FE3B583%2C790117C36F5F5C884BA0CF0B62A8A6A8%2C1E0E1B75C7D962CE4A0D21C83ADD66CD%2C41B90746D8C64D5158E18F82F50FB6A9%2CD136822584726EFF8E29B5829E89C729%2C3873E9956AC618D38415AEEC29F2B748%2C39621F5FB96DDFB0E0B6806D79C959C7%2C0E3356509729D58E327E1FCAE4251FC1%2C5D28199CB763A1AB830C82C1E721607F&FPIG=7EC6E997E658457A8E4EFBBF65E83DC2; MMCASM=ID=6AA5C31AA98A4003AE28BDCC8C023BF0; _U=1-2V_JzakDtqSztKgLEECO1R9XHMEhoueEqgelpBoUxyrFTLpFIIK9obxBl-i04TqP-60evkhkvf60JI8h5kEreizgaAgBacwj1H6XWw-VHAsQWIHiD2Y9sJvJSDbbwQdYYRXPA7nHVy13EH0JYAqKSSMUAKS2c27QPNbpyDUsEz5l1Rr2AKt9u-PHZhLvfSEbHpp7ZmqaB56aJ3QofaFxM9jtloFbu2S4bHU9H2eisI; ANON=A=2603708484E3666768D4DC41FFFFFFFF; WLS=C=abb4c32f1ce99e87&N=guangjian; SRCHUSR=DOB=20260123&DS=1&POEX=W; _EDGE_S=ui=zh-cn&SID=375BDA801D906A443A5FCC6C1CD36BDB; ENSEARCH=BENVER=0; _SS=PC=U316&SID=2CACFEE2B1B66C020D7EE808B0FC6DCE&R=432&RB=432&GB=0&RG=0&RP=432; ipv6=hit=1769377950331&t=4; SNRHOP=I=&TS=; _HPVN=CS=eyJQbiI6eyJDbiI6MywiU3QiOjAsIlFzIjowLCJQcm9kIjoiUCJ9LCJTYyI6eyJDbiI6MywiU3QiOjAsIlFzIjowLCJQcm9kIjoiSCJ9LCJReiI6eyJDbiI6MywiU3QiOjAsIlFzIjowLCJQcm9kIjoiVCJ9LCJBcCI6dHJ1ZSwiTXV0ZSI6dHJ1ZSwiTGFkIjoiMjAyNi0wMS0yNVQwMDowMDowMFoiLCJJb3RkIjowLCJHd2IiOjAsIlRucyI6MCwiRGZ0IjpudWxsLCJNdnMiOjAsIkZsdCI6MCwiSW1wIjoxMDgsIlRvYm4iOjB9; USRLOC=HS=1&ELOC=LAT=30.23801040649414|LON=119.92857360839844|N=%E4%BD%99%E6%9D%AD%E5%8C%BA%EF%BC%8C%E6%B5%99%E6%B1%9F%E7%9C%81|ELT=6|; _C_ETH=1; _RwBf=r=0&ilt=79&ihpd=2&ispd=34&rc=432&rb=432&rg=0&pc=432&mtu=0&rbb=0.0&clo=0&v=68&l=2026-01-25T08:00:00.0000000Z&lft=0001-01-01T00:00:00.0000000&aof=0&ard=0001-01-01T00:00:00.0000000&rwdbt=1683274769&rwflt=1683274288&rwaul2=0&g=newLevel1&o=0&p=bingcopilotwaitlist&c=MY00IA&t=2102&s=2023-02-12T13:07:18.3502621+00:00&ts=2026-01-25T20:54:54.2530659+00:00&rwred=0&wls=0&wlb=0&wle=1&ccp=2&cpt=0&lka=0&lkt=0&aad=0&TH=&cid=0&gb=2025w20_c&mta=0&e=vmMRZeYHvkXLbGV2i6YakK3tqRW-UQY-2Ojm-eR6fAa3wlPK-QrQOkC7GQVyK_FV5lmb4fjGXvOuyW6o1fxzMSVpjTuTIEMu0dXYlQ1DOnA; dsc=order=BingPages; SRCHHPGUSR=SRCHLANG=zh-Hans&BZA=0&PREFCOL=0&BRW=N&BRH=T&CW=1185&CH=1292&SCW=1170&SCH=3358&DPR=1.0&UTC=480&B=0&HV=1769374496&HVE=CfDJ8HAK7eZCYw5BifHFeUHnkJFJevRMUHRpgd1-jy5mkCDTmPyYlBzOtcXIjbUv0X8ScuoQJvUwUl-Kria0wOUeqyDSF14NrY74pPaTiLBhYlieaLVLrTRLazwz6_5XXIuAtpIWvlFRePnIAmEhgzrJMGQsLnck2d7WHRbbHw7PX3Ls8Qbu7gSWA7BIE4jt88jCJA&PRVCW=1185&PRVCH=1292&IG=CE7D0BEA21DC4D3299626E841E7EE4AA&EXLTT=13"
         }
-        
-        # Initialize cookies to maintain session state
-        self.cookies = httpx.Cookies()
+
+        # Reused across searches to keep connections alive, created on first use.
+        # Its cookie jar keeps the session cookies Bing sets between searches.
+        # httpx sets Accept-Encoding to the encodings it can decode (br when brotli is installed)
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Bounds concurrent requests so a burst of searches does not get the IP throttled
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        # Searches in flight, so identical concurrent searches share one request
+        self._inflight: Dict[Tuple[str, Optional[str]], "asyncio.Task[ToolResult[SearchResults]]"] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it if needed"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=30.0,
+                follow_redirects=True,
+                # Concurrent searches are multiplexed over one HTTP/2 connection
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0),
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the shared HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _fetch(self, params: Dict[str, str]) -> httpx.Response:
+        """Request a Bing result page, retrying throttling and connection errors
+
+        Args:
+            params: Query parameters
+
+        Returns:
+            Successful response
+        """
+        client = self._get_client()
+        # Fail fast while Bing is unreachable or rejecting us
+        circuit = get_circuit_breaker(self.base_url)
+        base_delay = 0.5
+        for attempt in range(self.MAX_RETRIES + 1):
+            if attempt > 0:
+                # Exponential backoff with jitter so throttled searches do not retry in lockstep
+                delay = backoff_delay(attempt - 1, base_delay, self.MAX_RETRY_DELAY)
+                logger.warning(
+                    f"Retrying Bing Search request (attempt {attempt + 1}/{self.MAX_RETRIES + 1}) after {delay:.2f}s delay"
+                )
+                await asyncio.sleep(delay)
+
+            circuit.before()
+            try:
+                async with self._semaphore:
+                    response = await client.get(self.base_url, params=params)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                circuit.record_failure()
+                retriable = isinstance(e, httpx.TransportError) or (
+                    isinstance(e, httpx.HTTPStatusError) and e.response.status_code in _RETRIABLE_STATUS
+                )
+                if not retriable or attempt == self.MAX_RETRIES:
+                    raise
+                logger.warning(f"Bing Search request failed: {e}")
+                continue
+            circuit.record_success()
+            return response
+
+    def _parse_serp(
+            self,
+            content: bytes,
+            encoding: Optional[str],
+            query: str,
+            date_range: Optional[str]
+    ) -> SearchResults:
+        """Extract search results from a Bing result page
+
+        Runs in a worker thread, parsing is CPU-bound.
+
+        Args:
+            content: Raw result page body
+            encoding: Charset from the response headers, if any. Without it libxml2
+                detects the encoding from the page's meta charset.
+            query: Search query
+            date_range: Time range filter used for the search
+
+        Returns:
+            Search results
+        """
+        # Parse the raw bytes, libxml2 decodes them while parsing
+        parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+        try:
+            tree = lxml_html.fromstring(content, parser=parser)
+        except etree.ParserError:
+            # Empty page (no elements at all), nothing to extract
+            return SearchResults(query=query, date_range=date_range, total_results=0, results=[])
+
+        # Extract search results
+        search_results = []
+
+        for item in _RESULT_ITEMS(tree):
+            try:
+                # Extract title and link
+                title = ""
+                link = ""
+
+                title_links = _TITLE_LINK(item)
+                if title_links:
+                    title = _text(title_links[0])
+                    link = title_links[0].get('href', '')
+
+                # If not found, try other structures (增强中文结果的解析)
+                if not title:
+                    for a in _ABSOLUTE_LINKS(item):
+                        text = _text(a)
+                        if len(text) > 10 and not text.startswith('http'):
+                            title = text
+                            link = a.get('href', '')
+                            break
+
+                if not title:
+                    continue
+
+                # Extract snippet (优化中文摘要解析)
+                snippet = ""
+
+                # Look for description in p tag with class 'b_lineclamp*' or 'b_descript'
+                snippet_tags = _SNIPPETS(item)
+                if snippet_tags:
+                    snippet = _text(snippet_tags[0])
+
+                # If not found, look for any p tag with substantial text
+                if not snippet:
+                    for p in _PARAGRAPHS(item):
+                        text = _text(p)
+                        if len(text) > 20:
+                            snippet = text
+                            break
+
+                # If still not found, get any substantial text from the item
+                if not snippet:
+                    all_text = _text(item)
+                    # Extract first sentence-like text that's not the title (兼容中文标点)
+                    # Scan sentences lazily instead of splitting the whole text up front
+                    for sentence in _SENTENCE_RE.finditer(all_text):
+                        clean_sentence = sentence.group().strip()
+                        if len(clean_sentence) > 20 and clean_sentence != title:
+                            snippet = clean_sentence
+                            break
+
+                # Resolve protocol-relative and relative links against the result page
+                if link and not link.startswith('http'):
+                    link = urljoin(self.base_url, link)
+
+                if title and link:
+                    search_results.append(SearchResultItem(
+                        title=title,
+                        link=link,
+                        snippet=snippet
+                    ))
+                    # Stop extracting once we have enough results
+                    if len(search_results) >= self.max_results:
+                        break
+            except Exception as e:
+                logger.warning(f"Failed to parse Bing search result: {e}")
+                continue
+
+        # Extract total results count (优化中文结果数解析)
+        total_results = 0
+        match = _TOTAL_RESULTS_RE.search(_TOTAL_RESULTS_TEXT(tree))
+        if match:
+            total_results = int(match.group(1).replace(',', '').replace('，', ''))
+
+        # Build return result
+        return SearchResults(
+            query=query,
+            date_range=date_range,
+            total_results=total_results,
+            results=search_results
+        )
 
     async def search(
             self,
@@ -46,6 +276,9 @@ class BingSearchEngine(SearchEngine):
     ) -> ToolResult[SearchResults]:
         """Search web pages using Bing web search (optimized for Chinese)
 
+        Identical searches issued concurrently (e.g. by parallel sessions) are
+        coalesced into a single Bing request.
+
         Args:
             query: Search query, using 1-3 keywords (support Chinese with space separator)
             date_range: (Optional) Time range filter for search results
@@ -53,6 +286,29 @@ class BingSearchEngine(SearchEngine):
         Returns:
             Search results
         """
+        key = (query, date_range)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._search(query, date_range))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so a cancelled caller does not cancel the search for the others
+        return await asyncio.shield(task)
+
+    async def _search(
+            self,
+            query: str,
+            date_range: Optional[str] = None
+    ) -> ToolResult[SearchResults]:
+        """Run a Bing search request and parse the result page"""
+        cache_key = None
+        if self._cache is not None:
+            digest = hashlib.blake2b(f"{query}|{date_range}".encode(), digest_size=16).hexdigest()
+            cache_key = f"search:bing:{digest}"
+            cached = await self._cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Bing Search cache hit for query: {query}")
+                return ToolResult(success=True, data=SearchResults.model_validate(cached))
 
         # Prepare query parameters
         
@@ -78,140 +334,27 @@ class BingSearchEngine(SearchEngine):
                 params["filters"] = date_mapping[date_range]
 
         try:
-            async with httpx.AsyncClient(
-                    headers=self.headers,
-                    cookies=self.cookies,
-                    timeout=30.0,
-                    follow_redirects=True,
-
-            ) as client:
-                response = await client.get(self.base_url, params=params)
-                response.raise_for_status()
+            response = await self._fetch(params)
+
+            # Parse off the event loop so other sessions keep making progress
+            results = await asyncio.to_thread(
+                self._parse_serp, response.content, response.charset_encoding, query, date_range
+            )
 
-                # Update cookies with response cookies in memory
-                self.cookies.update(response.cookies)
-
-                # Parse HTML content
-                soup = BeautifulSoup(response.text, 'html.parser')
-
-                # Extract search results
-                search_results = []
-
-                # Bing search results are in li elements with class 'b_algo' (兼容中文结果的class)
-                result_items = soup.find_all('li', class_=['b_algo', 'b_algoGroup'])
-
-                for item in result_items:
-                    try:
-                        # Extract title and link
-                        title = ""
-                        link = ""
-
-                        # Title is usually in h2 > a (兼容中文结果的结构)
-                        title_tag = item.find('h2')
-                        if title_tag:
-                            title_a = title_tag.find('a')
-                            if title_a:
-                                title = title_a.get_text(strip=True)
-                                link = title_a.get('href', '')
-
-                        # If not found, try other structures (增强中文结果的解析)
-                        if not title:
-                            title_links = item.find_all('a', href=re.compile(r'^https?'))
-                            for a in title_links:
-                                text = a.get_text(strip=True)
-                                if len(text) > 10 and not text.startswith('http'):
-                                    title = text
-                                    link = a.get('href', '')
-                                    break
-
-                        if not title:
-                            continue
-
-                        # Extract snippet (优化中文摘要解析)
-                        snippet = ""
-
-                        # Look for description in p tag with class 'b_lineclamp*' or 'b_descript'
-                        snippet_tags = item.find_all(
-                            ['p', 'div'],
-                            class_=re.compile(r'b_lineclamp\d+|b_descript|b_caption|b_snippet')
-                        )
-                        if snippet_tags:
-                            snippet = snippet_tags[0].get_text(strip=True)
-
-                        # If not found, look for any p tag with substantial text
-                        if not snippet:
-                            all_p_tags = item.find_all('p')
-                            for p in all_p_tags:
-                                text = p.get_text(strip=True)
-                                if len(text) > 20:
-                                    snippet = text
-                                    break
-
-                        # If still not found, get any substantial text from the item
-                        if not snippet:
-                            all_text = item.get_text(strip=True)
-                            # Extract first sentence-like text that's not the title (兼容中文标点)
-                            sentences = re.split(r'[。！？\n]', all_text)
-                            for sentence in sentences:
-                                clean_sentence = sentence.strip()
-                                if len(clean_sentence) > 20 and clean_sentence != title:
-                                    snippet = clean_sentence
-                                    break
-
-                        # Clean up link if needed
-                        if link and not link.startswith('http'):
-                            if link.startswith('//'):
-                                link = 'https:' + link
-                            elif link.startswith('/'):
-                                link = 'https://www.bing.com' + link
-
-                        if title and link:
-                            search_results.append(SearchResultItem(
-                                title=title,
-                                link=link,
-                                snippet=snippet
-                            ))
-                    except Exception as e:
-                        logger.warning(f"Failed to parse Bing search result: {e}")
-                        continue
-
-                # Extract total results count (优化中文结果数解析)
-                total_results = 0
-                # Bing shows result count in various places, try to find it
-                result_stats = soup.find_all(string=re.compile(r'(\d+[,\d]*)\s*(结果|results?)'))
-                if result_stats:
-                    for stat in result_stats:
-                        match = re.search(r'([\d,]+)\s*(结果|results?)', stat)
-                        if match:
-                            try:
-                                total_results = int(match.group(1).replace(',', ''))
-                                break
-                            except ValueError:
-                                continue
-
-                # Also try looking in the search results count area
-                if total_results == 0:
-                    count_elements = soup.find_all(['span', 'div'],
-                                                   class_=re.compile(r'sb_count|b_focusTextMedium|sb_count_separator'))
-                    for elem in count_elements:
-                        text = elem.get_text()
-                        match = re.search(r'([\d,]+)\s*(结果|results?)', text)
-                        if match:
-                            try:
-                                total_results = int(match.group(1).replace(',', ''))
-                                break
-                            except ValueError:
-                                continue
-
-                # Build return result
-                results = SearchResults(
-                    query=query,
-                    date_range=date_range,
-                    total_results=total_results,
-                    results=search_results
+            # A page without results may be a bot check rather than an empty search.
+            # One regex pass over the raw HTML, no need to extract the page text.
+            if not results.results and _ANTIBOT_RE.search(response.text):
+                logger.warning("Bing Search blocked by bot verification")
+                return ToolResult(
+                    success=False,
+                    message="Bing Search failed: blocked by bot verification",
+                    data=results
                 )
 
-                return ToolResult(success=True, data=results)
+            if cache_key is not None:
+                await self._cache.set(cache_key, results.model_dump(mode="json"), ttl=self._cache_ttl)
+
+            return ToolResult(success=True, data=results)
 
         except Exception as e:
             logger.error(f"Bing Search failed: {e}")
@@ -231,8 +374,6 @@ class BingSearchEngine(SearchEngine):
 
 # Simple test
 if __name__ == "__main__":
-    import asyncio
-    
     async def test():
         search_engine = BingSearchEngine()
         result = await search_engine.search("Python programming")
@@ -103,4 +103,7 @@ class SessionDocument(BaseDocument[Session], id_field="session_id", domain_model
         indexes = [
             "session_id",
             "user_id",  # Add index for user_id for efficient queries
+            # Stale RUNNING session cleanup scans by status and activity time
+            IndexModel([("status", ASCENDING), ("latest_message_at", ASCENDING)]),
+            IndexModel([("status", ASCENDING), ("updated_at", ASCENDING)]),
         ]
\ No newline at end of file
@@ -0,0 +1,18 @@
+import random
+
+
+def backoff_delay(retry: int, base: float, cap: float, jitter: float = 0.5) -> float:
+    """Get the delay before a retry, using capped exponential backoff with jitter
+
+    The jitter keeps callers that failed together from retrying in lockstep.
+
+    Args:
+        retry: Number of the retry, 0 for the first one
+        base: Delay before the first retry (seconds)
+        cap: Maximum delay before jitter is applied (seconds)
+        jitter: Relative jitter applied to the delay, in [0, 1)
+
+    Returns:
+        Seconds to wait before retrying
+    """
+    return min(cap, base * 2 ** retry) * random.uniform(1 - jitter, 1 + jitter)
@@ -0,0 +1,80 @@
+from functools import lru_cache
+import logging
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because its circuit is open"""
+
+
+class CircuitBreaker:
+    """Circuit breaker for calls to an external service
+
+    The circuit opens after failure_threshold consecutive failures, and calls are
+    then rejected immediately instead of waiting on a service that is down. Once
+    reset_timeout has passed the circuit is half-open: calls go through again, the
+    first success closes the circuit and a failure opens it for another period.
+
+    The breaker is only used from the event loop and never awaits, so it needs
+    no lock.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def before(self):
+        """Check that a call may proceed
+
+        Raises:
+            CircuitOpenError: The circuit is open
+        """
+        if self._state == self.OPEN:
+            if time.monotonic() - self._opened_at < self._reset_timeout:
+                raise CircuitOpenError(f"Circuit for {self.name} is open, failing fast")
+            logger.info(f"Circuit for {self.name} is half-open, trying again")
+            self._state = self.HALF_OPEN
+
+    def record_success(self):
+        """Record a successful call"""
+        if self._state != self.CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self._state = self.CLOSED
+        self._failures = 0
+
+    def record_failure(self):
+        """Record a failed call"""
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self._failure_threshold:
+            if self._state != self.OPEN:
+                logger.warning(f"Circuit for {self.name} opened after {self._failures} consecutive failures")
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+@lru_cache()
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Get the circuit breaker shared by all calls to an endpoint
+
+    Args:
+        name: Endpoint identifier, e.g. its base URL
+
+    Returns:
+        CircuitBreaker: Breaker for the endpoint
+    """
+    return CircuitBreaker(name)
@@ -7,6 +7,8 @@ import asyncio
 from app.core.config import get_settings
 from app.infrastructure.storage.mongodb import get_mongodb
 from app.infrastructure.storage.redis import get_redis
+from app.infrastructure.external.browser.playwright_browser import shutdown_shared_browsers
+from app.infrastructure.external.search import get_search_engine
 from app.interfaces.dependencies import get_agent_service
 from app.interfaces.api.routes import router
 from app.infrastructure.logging import setup_logging
@@ -60,9 +62,8 @@ async def lifespan(app: FastAPI):
         session_stale_seconds = getattr(settings, "session_stale_seconds", 60*60*24)
         while True:
             try:
-                cutoff = datetime.now(timezone.utc) - timedelta(
-                    seconds=session_stale_seconds
-                )
+                now = datetime.now(timezone.utc)
+                cutoff = now - timedelta(seconds=session_stale_seconds)
                 # Find sessions that are RUNNING and have no recent updates
                 query = {
                     "status": SessionStatus.RUNNING,
@@ -72,20 +73,12 @@ async def lifespan(app: FastAPI):
                         {"updated_at": {"$lt": cutoff}},
                     ],
                 }
-                docs = await SessionDocument.find(query).to_list()
-                if docs:
-                    for doc in docs:
-                        try:
-                            doc.status = SessionStatus.COMPLETED
-                            doc.updated_at = datetime.now(timezone.utc)
-                            await doc.save()
-                            logger.info(
-                                f"Marked stale session {doc.session_id} as COMPLETED"
-                            )
-                        except Exception:
-                            logger.exception(
-                                f"Failed to mark session {doc.session_id} as COMPLETED"
-                            )
+                # One update_many round-trip instead of loading and saving each session
+                result = await SessionDocument.find(query).update(
+                    {"$set": {"status": SessionStatus.COMPLETED, "updated_at": now}}
+                )
+                if result is not None and result.modified_count:
+                    logger.info(f"Marked {result.modified_count} stale sessions as COMPLETED")
                 await asyncio.sleep(60)
             except asyncio.CancelledError:
                 break
@@ -113,6 +106,18 @@ async def lifespan(app: FastAPI):
             logger.warning("AgentService shutdown timed out after 30 seconds")
         except Exception as e:
             logger.error(f"Error during AgentService cleanup: {str(e)}")
+        # Disconnect shared browsers once no session can use them anymore
+        try:
+            await shutdown_shared_browsers()
+        except Exception:
+            logger.exception("Error shutting down shared browsers")
+        # Close the search engine's pooled HTTP connections
+        try:
+            search_engine = get_search_engine()
+            if hasattr(search_engine, "aclose"):
+                await search_engine.aclose()
+        except Exception:
+            logger.exception("Error closing search engine")
         # Cancel cleanup task if running
         try:
             if cleanup_task:
@@ -0,0 +1,14 @@
+from app.infrastructure.utils import backoff
+from app.infrastructure.utils.backoff import backoff_delay
+
+
+def test_backoff_delay_doubles_up_to_cap(monkeypatch):
+    # Without jitter the delay doubles per retry until it reaches the cap
+    monkeypatch.setattr(backoff.random, "uniform", lambda low, high: (low + high) / 2)
+    assert [backoff_delay(retry, 0.5, 3.0) for retry in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+
+def test_backoff_delay_jitter_bounds():
+    for _ in range(100):
+        assert 1.0 <= backoff_delay(1, 1.0, 10.0, jitter=0.5) <= 3.0
+        assert 8.0 <= backoff_delay(10, 1.0, 10.0, jitter=0.2) <= 12.0
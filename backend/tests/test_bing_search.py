@@ -0,0 +1,184 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.infrastructure.external.search import bing_search
+from app.infrastructure.external.search.bing_search import BingSearchEngine
+from app.infrastructure.utils.circuit_breaker import CircuitBreaker
+
+
+SERP_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>python - 搜索</title></head>
+<body>
+<div id="b_tween"><span class="sb_count">约 1,230,000 个结果</span></div>
+<ol id="b_results">
+<li class="b_algo">
+    <h2><a href="/ck/a?u=first">First <b>result</b></a></h2>
+    <div class="b_caption"><p class="b_lineclamp2">Snippet of the <b>first</b> result</p></div>
+</li>
+<li class="b_ad"><h2><a href="https://ads.example.com">Sponsored result</a></h2></li>
+<li class="b_algo b_vtl_deeplinks">
+    <div><a href="/short">short</a><a href="https://example.com/second">Second result title</a></div>
+    <p>tiny</p>
+</li>
+<li class="b_algo">
+    <h2><a href="//example.org/third">Result three</a></h2>
+    <div><span>首先。</span><span>这是一个足够长的中文句子用于测试摘要的回退逻辑是否正确。</span></div>
+</li>
+<li class="b_algo">
+    <h2><a href="https://example.net/fourth">Fourth result</a></h2>
+</li>
+</ol>
+</body></html>
+""".encode("utf-8")
+
+
+def test_parse_serp_extracts_results():
+    results = BingSearchEngine()._parse_serp(SERP_HTML, "utf-8", "python", None)
+
+    assert results.query == "python"
+    assert results.total_results == 1230000
+    assert [(item.title, item.link, item.snippet) for item in results.results] == [
+        # h2 > a title, relative link resolved against Bing, snippet class match
+        ("Firstresult", "https://www.bing.com/ck/a?u=first", "Snippet of thefirstresult"),
+        # No heading: first absolute link with a long enough text
+        ("Second result title", "https://example.com/second", "shortSecond result titletiny"),
+        # Protocol-relative link, snippet from the first long sentence of the item text
+        ("Result three", "https://example.org/third", "这是一个足够长的中文句子用于测试摘要的回退逻辑是否正确"),
+        ("Fourth result", "https://example.net/fourth", ""),
+    ]
+
+
+def test_parse_serp_stops_at_max_results():
+    results = BingSearchEngine(max_results=2)._parse_serp(SERP_HTML, "utf-8", "python", "past_day")
+
+    assert [item.link for item in results.results] == [
+        "https://www.bing.com/ck/a?u=first",
+        "https://example.com/second",
+    ]
+    assert results.date_range == "past_day"
+
+
+def test_parse_serp_empty_page():
+    for content in (b"", b"  \n", b"<html><body></body></html>"):
+        results = BingSearchEngine()._parse_serp(content, None, "python", None)
+        assert results.results == []
+        assert results.total_results == 0
+
+
+def _serp_response():
+    request = httpx.Request("GET", "https://www.bing.com/search")
+    return httpx.Response(200, content=SERP_HTML, headers={"Content-Type": "text/html; charset=utf-8"}, request=request)
+
+
+def _gated_fetch(engine, gate):
+    """Replace the engine's Bing request with one answering once gate is set, returns the params of every call"""
+    calls = []
+
+    async def fetch(params):
+        calls.append(params)
+        await gate.wait()
+        return _serp_response()
+
+    engine._fetch = fetch
+    return calls
+
+
+async def test_search_coalesces_identical_concurrent_searches():
+    engine = BingSearchEngine()
+    gate = asyncio.Event()
+    calls = _gated_fetch(engine, gate)
+
+    tasks = [asyncio.create_task(engine.search("python")) for _ in range(5)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*tasks)
+
+    assert len(calls) == 1
+    assert all(result.success and len(result.data.results) == 4 for result in results)
+    assert engine._inflight == {}
+
+
+async def test_search_cancelled_waiter_does_not_cancel_shared_search():
+    engine = BingSearchEngine()
+    gate = asyncio.Event()
+    calls = _gated_fetch(engine, gate)
+
+    first = asyncio.create_task(engine.search("python"))
+    second = asyncio.create_task(engine.search("python"))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    gate.set()
+
+    result = await second
+    assert result.success and len(result.data.results) == 4
+    assert first.cancelled()
+    assert len(calls) == 1
+
+
+async def test_search_does_not_merge_different_date_ranges():
+    engine = BingSearchEngine()
+    gate = asyncio.Event()
+    calls = _gated_fetch(engine, gate)
+
+    tasks = [
+        asyncio.create_task(engine.search("python")),
+        asyncio.create_task(engine.search("python", "past_day")),
+    ]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*tasks)
+
+    assert len(calls) == 2
+    assert [call.get("filters") for call in calls] == [None, "interval%3d%22Day%22"]
+    assert [result.data.date_range for result in results] == [None, "past_day"]
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(bing_search.asyncio, "sleep", sleep)
+    # A fresh circuit, the shared one would carry failures over between tests
+    circuit = CircuitBreaker("test")
+    monkeypatch.setattr(bing_search, "get_circuit_breaker", lambda name: circuit)
+    return delays
+
+
+def _engine_with_statuses(statuses):
+    """Engine whose client answers with the given statuses in turn, returns it with the list of requests seen"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(statuses[len(requests) - 1], content=SERP_HTML)
+
+    engine = BingSearchEngine()
+    engine._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return engine, requests
+
+
+async def test_fetch_retries_throttling_once(sleeps):
+    engine, requests = _engine_with_statuses([503, 200])
+
+    response = await engine._fetch({"q": "python"})
+    assert response.status_code == 200
+    assert len(requests) == 2
+    # First retry: 0.5s base delay with +/-50% jitter
+    assert len(sleeps) == 1 and 0.25 <= sleeps[0] <= 0.75
+    await engine.aclose()
+
+
+async def test_fetch_does_not_retry_client_errors(sleeps):
+    engine, requests = _engine_with_statuses([404, 200])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await engine._fetch({"q": "python"})
+    assert len(requests) == 1
+    assert sleeps == []
+    await engine.aclose()
@@ -0,0 +1,42 @@
+import pytest
+
+from app.infrastructure.utils import circuit_breaker
+from app.infrastructure.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def test_circuit_breaker_opens_and_recovers(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30.0)
+
+    # Failures below the threshold keep the circuit closed, a success resets the count
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.before()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    # Reaching the threshold opens the circuit and calls fail fast
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+
+    # After the reset timeout a trial call is allowed, and its failure reopens the circuit
+    now[0] = 31.0
+    breaker.before()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before()
+
+    # A successful trial call closes the circuit
+    now[0] = 62.0
+    breaker.before()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before()
@@ -0,0 +1,236 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIStatusError, AuthenticationError, BadRequestError, RateLimitError
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+
+from app.infrastructure.external.llm import openai_llm
+from app.infrastructure.external.llm.openai_llm import (
+    OpenAILLM,
+    _ResponseCache,
+    _RetryTokenBucket,
+    _parse_max_tokens_limit,
+    _parse_retry_after,
+)
+from app.infrastructure.utils.circuit_breaker import CircuitBreaker
+
+
+@pytest.mark.parametrize("error_msg, expected", [
+    ("Error code: 400 - Please reduce your max_tokens to 4096.", 4096),
+    ("max_tokens is too large: 32000. This model supports at most 8192 completion tokens, whereas you provided 32000.", 8192),
+    ("Invalid max_tokens value, the valid range of max_tokens is [1, 16384]", 16384),
+    (
+        "This model's maximum context length is 8192 tokens. However, you requested 10000 tokens "
+        "(2000 in the messages, 8000 in the completion). Please reduce the length of the messages or completion.",
+        6192,
+    ),
+    # The prompt alone fills the context, there is no usable limit
+    ("This model's maximum context length is 4096 tokens. However, you requested 5000 tokens (4500 in the messages", None),
+    # Numbers that are not a completion token limit
+    ("max_tokens too large, at most 4 images are allowed", None),
+    ("max_tokens is too large", None),
+])
+def test_parse_max_tokens_limit(error_msg, expected):
+    assert _parse_max_tokens_limit(error_msg) == expected
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after-ms": "1500"}, 1.5),
+    ({"retry-after": "20"}, 20.0),
+    ({"retry-after": "0.5", "x-ratelimit-reset-requests": "6m0s"}, 0.5),
+    ({"x-ratelimit-reset-requests": "6m0s"}, 360.0),
+    ({"x-ratelimit-reset-tokens": "1m30.5s"}, 90.5),
+    ({"x-ratelimit-reset-tokens": "20ms"}, 0.02),
+    ({"retry-after-ms": "soon", "x-ratelimit-reset-requests": "2s"}, 2.0),
+    ({}, None),
+])
+def test_parse_retry_after(headers, expected):
+    assert _parse_retry_after(httpx.Headers(headers)) == pytest.approx(expected)
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    delay = _parse_retry_after(httpx.Headers({"Retry-After": format_datetime(retry_at, usegmt=True)}))
+    assert 28.0 <= delay <= 30.0
+
+    # A date in the past means retry right away
+    retry_at = datetime.now(timezone.utc) - timedelta(seconds=30)
+    assert _parse_retry_after(httpx.Headers({"Retry-After": format_datetime(retry_at, usegmt=True)})) == 0.0
+
+
+def _completion(content="ok"):
+    choices = [Choice(index=0, finish_reason="stop", message=ChatCompletionMessage(role="assistant", content=content))]
+    return ChatCompletion(id="chatcmpl", object="chat.completion", created=0, model="test", choices=choices if content else [])
+
+
+def _status_error(cls, status, headers=None, message="error"):
+    request = httpx.Request("POST", "https://api.example.com/v1/chat/completions")
+    return cls(message, response=httpx.Response(status, headers=headers, request=request), body=None)
+
+
+class StubCompletions:
+    """Stand-in for client.chat.completions replaying scripted outcomes
+
+    When gate is set, calls wait for it before answering.
+    """
+
+    def __init__(self, outcomes, gate=None):
+        self.outcomes = list(outcomes)
+        self.gate = gate
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def make_llm(monkeypatch):
+    # Every test gets its own retry quota and circuit
+    monkeypatch.setattr(OpenAILLM, "_retry_tokens", _RetryTokenBucket())
+
+    def make(outcomes, gate=None):
+        llm = OpenAILLM()
+        llm.client = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions(outcomes, gate)))
+        llm._circuit = CircuitBreaker("test")
+        return llm
+
+    return make
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(openai_llm.asyncio, "sleep", sleep)
+    return delays
+
+
+@pytest.mark.parametrize("error", [
+    _status_error(BadRequestError, 400, message="Invalid message role"),
+    _status_error(AuthenticationError, 401, message="Invalid API key"),
+])
+async def test_ask_raises_client_errors_without_retry(make_llm, sleeps, error):
+    llm = make_llm([error])
+    with pytest.raises(type(error)):
+        await llm.ask([{"role": "user", "content": "hi"}])
+    assert llm.client.chat.completions.calls == 1
+    assert sleeps == []
+
+
+async def test_ask_honours_retry_after(make_llm, sleeps):
+    llm = make_llm([_status_error(RateLimitError, 429, {"retry-after": "2"}), _completion()])
+    assert (await llm.ask([{"role": "user", "content": "hi"}]))["content"] == "ok"
+    assert llm.client.chat.completions.calls == 2
+    # The stated wait plus a little jitter, not the short exponential backoff
+    assert len(sleeps) == 1 and 2.0 <= sleeps[0] <= 2.5
+
+
+async def test_ask_fails_fast_when_rate_limit_resets_late(make_llm, sleeps):
+    llm = make_llm([_status_error(RateLimitError, 429, {"retry-after": "60"}), _completion()])
+    with pytest.raises(RateLimitError):
+        await llm.ask([{"role": "user", "content": "hi"}])
+    assert llm.client.chat.completions.calls == 1
+    assert sleeps == []
+
+
+async def test_ask_stops_when_retry_quota_exhausted(monkeypatch, make_llm, sleeps):
+    llm = make_llm([_status_error(APIStatusError, 503) for _ in range(5)])
+    monkeypatch.setattr(OpenAILLM, "_retry_tokens", _RetryTokenBucket(capacity=1))
+    with pytest.raises(APIStatusError):
+        await llm.ask([{"role": "user", "content": "hi"}])
+    # One retry was paid for, the next one found the bucket empty
+    assert llm.client.chat.completions.calls == 2
+    assert len(sleeps) == 1
+
+
+async def test_ask_no_choices_counts_as_one_failure(make_llm, sleeps):
+    llm = make_llm([_completion(content=None) for _ in range(5)])
+    # Opens on a sixth failure, one more than there are attempts
+    llm._circuit = CircuitBreaker("test", failure_threshold=6)
+    with pytest.raises(ValueError):
+        await llm.ask([{"role": "user", "content": "hi"}])
+    assert llm.client.chat.completions.calls == 5
+    assert llm._circuit.state == CircuitBreaker.CLOSED
+
+
+@pytest.fixture
+def make_cached_llm(make_llm):
+    def make(outcomes, gate=None, ttl=60.0):
+        llm = make_llm(outcomes, gate)
+        llm._response_cache = _ResponseCache(maxsize=16, ttl=ttl)
+        return llm
+
+    return make
+
+
+async def test_ask_coalesces_identical_concurrent_requests(make_cached_llm):
+    gate = asyncio.Event()
+    llm = make_cached_llm([_completion()], gate)
+    messages = [{"role": "user", "content": "hi"}]
+
+    tasks = [asyncio.create_task(llm.ask(messages)) for _ in range(5)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*tasks)
+
+    assert llm.client.chat.completions.calls == 1
+    assert all(result["content"] == "ok" for result in results)
+    # Every caller gets its own copy to modify
+    assert len({id(result) for result in results}) == 5
+
+
+async def test_ask_cancelled_caller_does_not_cancel_shared_request(make_cached_llm):
+    gate = asyncio.Event()
+    llm = make_cached_llm([_completion()], gate)
+    messages = [{"role": "user", "content": "hi"}]
+
+    first = asyncio.create_task(llm.ask(messages))
+    others = [asyncio.create_task(llm.ask(messages)) for _ in range(2)]
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    gate.set()
+
+    assert [result["content"] for result in await asyncio.gather(*others)] == ["ok", "ok"]
+    assert first.cancelled()
+    assert llm.client.chat.completions.calls == 1
+
+
+async def test_ask_does_not_cache_failures(make_cached_llm):
+    llm = make_cached_llm([_status_error(BadRequestError, 400, message="Invalid message role"), _completion()])
+    messages = [{"role": "user", "content": "hi"}]
+
+    with pytest.raises(BadRequestError):
+        await llm.ask(messages)
+    assert (await llm.ask(messages))["content"] == "ok"
+    assert llm.client.chat.completions.calls == 2
+
+
+async def test_ask_cache_entries_expire(monkeypatch, make_cached_llm):
+    now = [0.0]
+    monkeypatch.setattr(openai_llm.time, "monotonic", lambda: now[0])
+    llm = make_cached_llm([_completion("first"), _completion("second")], ttl=60.0)
+    messages = [{"role": "user", "content": "hi"}]
+
+    assert (await llm.ask(messages))["content"] == "first"
+    now[0] = 59.0
+    assert (await llm.ask(messages))["content"] == "first"
+    assert llm.client.chat.completions.calls == 1
+
+    now[0] = 61.0
+    assert (await llm.ask(messages))["content"] == "second"
+    assert llm.client.chat.completions.calls == 2
@@ -1,13 +1,18 @@
 import asyncio
 import pytest
+from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 
-from app.infrastructure.external.browser.playwright_browser import PlaywrightBrowser
+from app.infrastructure.external.browser import playwright_browser as pwmod
+from app.infrastructure.external.browser.playwright_browser import PlaywrightBrowser, shutdown_shared_browsers
 
 
 class DummyPage:
+    # The browser caches its scan results on the page object, like on a real Page
+    __slots__ = ("closed", "handlers", "interactive_elements_cache", "page_content_cache")
+
     def __init__(self):
         self.closed = False
-        self._closed = False
+        self.handlers = {}
 
     async def close(self):
         self.closed = True
@@ -18,80 +23,412 @@ class DummyPage:
     async def evaluate(self, script):
         return True
 
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    async def add_init_script(self, script):
+        pass
+
     async def screenshot(self):
         return b"screenshot"
 
 
-class DummyContext:
+class DummyKeyboard:
+    def __init__(self):
+        self.typed = []
+
+    async def type(self, text):
+        self.typed.append(text)
+
+    async def press(self, key):
+        self.typed.append(key)
+
+
+class ScanPage(DummyPage):
+    """Page answering the viewport scan with a single text field
+
+    Like a real page after typing, it never reports itself dirty, the value
+    typed into the field only shows up when the scan actually runs.
+    """
+
     def __init__(self):
+        super().__init__()
+        self.keyboard = DummyKeyboard()
+        self.scans = []
+
+    async def evaluate(self, script, arg=None):
+        if script == pwmod._CALL_SCAN_JS:
+            with_content, reuse = arg
+            self.scans.append(reuse)
+            if reuse:
+                return {"unchanged": True}
+            text = self.keyboard.typed[-1] if self.keyboard.typed else "[text]"
+            field = {"index": 0, "tag": "input", "text": text, "selector": '[data-manus-id="manus-element-0"]'}
+            return {"interactive": [field], "content": None}
+        if script == pwmod._RESOLVE_MANY_JS:
+            return [{"x": 10, "y": 10, "visible": True, "focused": True}]
+        return True
+
+    def locator(self, selector):
+        return selector
+
+
+class DummyConsoleMessage:
+    def __init__(self, type, text):
+        self.type = type
+        self.text = text
+
+
+class DummyContext:
+    __slots__ = ("browser", "pages", "closed", "cookies_cleared")
+
+    def __init__(self, browser=None):
+        self.browser = browser
+        self.pages = []
         self.closed = False
+        self.cookies_cleared = False
 
     async def new_page(self):
-        return DummyPage()
+        page = DummyPage()
+        self.pages.append(page)
+        return page
+
+    async def clear_cookies(self):
+        self.cookies_cleared = True
 
     async def close(self):
+        # Like Playwright, closing a context closes its pages
+        for page in self.pages:
+            await page.close()
         self.closed = True
 
 
 class DummyBrowser:
+    __slots__ = ("contexts", "connected")
+
     def __init__(self):
         self.contexts = []
+        self.connected = True
 
     async def new_context(self):
-        ctx = DummyContext()
+        ctx = DummyContext(self)
         self.contexts.append(ctx)
         return ctx
 
+    def is_connected(self):
+        return self.connected
+
+    async def close(self):
+        self.connected = False
+
 
 class DummyChromium:
+    __slots__ = ("_browser", "connects")
+
     def __init__(self, browser):
         self._browser = browser
+        self.connects = 0
 
     async def connect_over_cdp(self, cdp_url):
+        self.connects += 1
         return self._browser
 
 
 class DummyPlaywright:
+    __slots__ = ("chromium",)
+
     def __init__(self, browser):
         self.chromium = DummyChromium(browser)
 
     async def start(self):
         return self
 
+    async def stop(self):
+        pass
+
+
+@pytest.fixture
+def dummy_browser():
+    return DummyBrowser()
 
-@pytest.mark.asyncio
-async def test_playwright_browser_isolated_context(monkeypatch):
-    dummy_browser = DummyBrowser()
-    dummy_playwright = DummyPlaywright(dummy_browser)
 
+@pytest.fixture
+async def dummy_playwright(monkeypatch, dummy_browser):
+    dummy_playwright = DummyPlaywright(dummy_browser)
     # Patch async_playwright to return our dummy
-    monkeypatch.setattr('app.infrastructure.external.browser.playwright_browser.async_playwright', lambda: dummy_playwright)
+    monkeypatch.setattr(pwmod, "async_playwright", lambda: dummy_playwright)
+    yield dummy_playwright
+    # Shared browsers are cached per CDP URL, drop them so each test connects anew
+    await shutdown_shared_browsers()
+
 
+@pytest.fixture
+async def playwright_browser(dummy_playwright):
     pw = PlaywrightBrowser(cdp_url="http://localhost:9222")
+    yield pw
+    await pw.cleanup()
 
-    # Initialize should create a context and a page
-    ok = await pw.initialize()
+
+@pytest.mark.asyncio
+async def test_playwright_browser_initialize(playwright_browser):
+    # Initialize only connects; context and page are created on first use
+    ok = await playwright_browser.initialize()
     assert ok is True
-    assert pw.context is not None
-    assert pw.page is not None
+    assert playwright_browser.context is None
+    assert playwright_browser.page is None
+
+
+@pytest.mark.asyncio
+async def test_playwright_browser_ensure_page_idempotent(playwright_browser, dummy_browser):
+    # Ensure _ensure_page creates the page once and then returns the same instance
+    page = await playwright_browser._ensure_page()
+    assert playwright_browser.context is not None
+    assert page is playwright_browser.page
+    assert await playwright_browser._ensure_page() is page
+    assert len(dummy_browser.contexts) == 1
 
-    # Ensure _ensure_page returns the same page instance
-    page = await pw._ensure_page()
-    assert page is pw.page
 
+@pytest.mark.asyncio
+async def test_playwright_browser_screenshot(playwright_browser):
     # Take screenshot (dummy implementation) via page.screenshot
-    data = await pw.page.screenshot()
+    page = await playwright_browser._ensure_page()
+    data = await page.screenshot()
     assert data == b"screenshot"
 
-    # Cleanup should close context and page
-    await pw.cleanup()
-    assert pw.context is None
-    assert pw.page is None
 
-    # Re-initialize after cleanup should work (creates new context/page)
-    ok2 = await pw.initialize()
-    assert ok2 is True
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cycles", [1, 3])
+async def test_playwright_browser_reinitialize_after_cleanup(playwright_browser, dummy_browser, cycles):
+    pw = playwright_browser
+    for _ in range(cycles):
+        page = await pw._ensure_page()
+        context = pw.context
+
+        # Cleanup should close context and page
+        await pw.cleanup()
+        assert pw.context is None
+        assert pw.page is None
+        assert context.closed
+        assert page.closed
+
+        # Re-initialize after cleanup should work (creates new context/page)
+        ok = await pw.initialize()
+        assert ok is True
+    await pw._ensure_page()
     assert pw.context is not None
     assert pw.page is not None
+    assert len(dummy_browser.contexts) == cycles + 1
+
+    await pw.cleanup()
+
+    # The shared browser connection survives instance cleanup
+    assert dummy_browser.is_connected()
+    await shutdown_shared_browsers()
+    assert not dummy_browser.is_connected()
+
+
+@pytest.mark.asyncio
+async def test_playwright_browser_concurrent_sessions_share_browser(dummy_playwright, dummy_browser):
+    browsers = [PlaywrightBrowser(cdp_url="http://localhost:9222") for _ in range(3)]
 
-    await pw.cleanup()
\ No newline at end of file
+    # Sessions starting at the same time connect once and get a context each
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(pw._ensure_page()) for pw in browsers]
+
+    assert dummy_playwright.chromium.connects == 1
+    assert all(pw.browser is dummy_browser for pw in browsers)
+    assert len({id(task.result()) for task in tasks}) == 3
+    assert len(dummy_browser.contexts) == 3
+
+    async with asyncio.TaskGroup() as tg:
+        for pw in browsers:
+            tg.create_task(pw.cleanup())
+    assert all(context.closed for context in dummy_browser.contexts)
+
+
+@pytest.mark.asyncio
+async def test_playwright_browser_slow_endpoint_does_not_block_others(monkeypatch):
+    slow_browser = DummyBrowser()
+    fast_browser = DummyBrowser()
+    slow_connected = asyncio.Event()
+
+    class DummyChromiumPerEndpoint:
+        async def connect_over_cdp(self, cdp_url):
+            if "slow" in cdp_url:
+                # Chrome in this sandbox is still starting
+                await slow_connected.wait()
+                return slow_browser
+            return fast_browser
+
+    dummy_playwright = DummyPlaywright(None)
+    dummy_playwright.chromium = DummyChromiumPerEndpoint()
+    monkeypatch.setattr(pwmod, "async_playwright", lambda: dummy_playwright)
+
+    slow = PlaywrightBrowser(cdp_url="http://slow:9222")
+    fast = PlaywrightBrowser(cdp_url="http://fast:9222")
+    slow_task = asyncio.create_task(slow._ensure_page())
+    try:
+        await asyncio.sleep(0)
+        # Another sandbox's session is served while the slow connect is pending
+        await asyncio.wait_for(fast._ensure_page(), timeout=1)
+        assert fast.browser is fast_browser
+        assert not slow_task.done()
+
+        slow_connected.set()
+        await slow_task
+        assert slow.browser is slow_browser
+    finally:
+        slow_task.cancel()
+        await fast.cleanup()
+        await slow.cleanup()
+        await shutdown_shared_browsers()
+
+
+@pytest.mark.asyncio
+async def test_playwright_browser_context_pool(monkeypatch, dummy_browser, playwright_browser):
+    first = playwright_browser
+    second = PlaywrightBrowser(cdp_url="http://localhost:9222")
+    monkeypatch.setattr(first.settings, "browser_context_pool_size", 1)
+
+    # A released context is reset and handed to the next session with a fresh page
+    await first._ensure_page()
+    context = first.context
+    first_page = first.page
+    await first.cleanup()
+    assert first_page.closed
+    assert not context.closed
+    assert context.cookies_cleared
+
+    await second._ensure_page()
+    assert second.context is context
+    assert second.page is not first_page
+    assert len(dummy_browser.contexts) == 1
+
+    # The pool holds a single context, so releasing a second one evicts the oldest
+    await first._ensure_page()
+    assert len(dummy_browser.contexts) == 2
+    await second.cleanup()
+    await first.cleanup()
+    assert context.closed
+    assert not dummy_browser.contexts[1].closed
+
+
+@pytest.mark.asyncio
+async def test_playwright_browser_console_view(playwright_browser):
+    pw = playwright_browser
+    page = await pw._ensure_page()
+
+    # Console messages are buffered from the page's console events
+    for i in range(3):
+        page.handlers["console"](DummyConsoleMessage("log", f"message {i}"))
+
+    result = await pw.console_view()
+    assert result.data["logs"] == [{"type": "log", "text": f"message {i}"} for i in range(3)]
+    result = await pw.console_view(max_lines=1)
+    assert result.data["logs"] == [{"type": "log", "text": "message 2"}]
+
+    # Messages of a previous page are not reported for the next one
+    await pw.cleanup()
+    result = await pw.console_view()
+    assert result.data["logs"] == []
+    page = await pw._ensure_page()
+    page.handlers["console"](DummyConsoleMessage("warning", "new page"))
+    result = await pw.console_view()
+    assert result.data["logs"] == [{"type": "warning", "text": "new page"}]
+
+
+@pytest.mark.asyncio
+async def test_playwright_browser_rescans_after_input(playwright_browser):
+    pw = playwright_browser
+    await pw._ensure_page()
+    page = pw.page = ScanPage()
+
+    assert await pw._extract_interactive_elements() == ["0:<input>[text]</input>"]
+    # Nothing happened since, the previous scan is reused
+    assert await pw._extract_interactive_elements() == ["0:<input>[text]</input>"]
+    assert page.scans == [False, True]
+
+    # Typing changes the field value without any DOM mutation
+    result = await pw.input("hello", press_enter=False, index=0)
+    assert result.success
+    assert await pw._extract_interactive_elements() == ["0:<input>hello</input>"]
+    assert page.scans == [False, True, False]
+
+
+@pytest.mark.parametrize("error, expected", [
+    (PlaywrightError("BrowserType.connect_over_cdp: connect ECONNREFUSED 127.0.0.1:9222"), True),
+    (PlaywrightError("WebSocket error: socket hang up"), True),
+    (PlaywrightTimeoutError("Timeout 30000ms exceeded"), True),
+    (ConnectionResetError(), True),
+    # The endpoint answered and rejected the handshake, retrying cannot help
+    (PlaywrightError("WebSocket error: ws://localhost:9222/devtools/browser 404 Not Found"), False),
+    (PlaywrightError("WebSocket error: ws://localhost:9222/devtools/browser 401 Unauthorized"), False),
+    (PlaywrightError("Protocol error (Target.createTarget): Not allowed"), False),
+    # Same handle on every retry, the caller has to replace it
+    (PlaywrightError("BrowserContext.new_page: Target page, context or browser has been closed"), False),
+    (ValueError("bad cdp_url"), False),
+])
+def test_is_recoverable(error, expected):
+    assert pwmod._is_recoverable(error) is expected
+
+
+class ClosedBrowser(DummyBrowser):
+    """Browser whose connection died while it still reports being connected"""
+
+    async def new_context(self):
+        raise PlaywrightError("Browser.new_context: Target page, context or browser has been closed")
+
+
+class ClosedContext(DummyContext):
+    async def new_page(self):
+        raise PlaywrightError("BrowserContext.new_page: Target page, context or browser has been closed")
+
+
+@pytest.mark.asyncio
+async def test_playwright_browser_reconnects_closed_browser(dummy_playwright, dummy_browser, playwright_browser):
+    closed_browser = ClosedBrowser()
+    pwmod._BROWSERS[playwright_browser.cdp_url] = closed_browser
+
+    # The dead handle is dropped and the next connection is used, without backoff retries
+    page = await playwright_browser._ensure_page()
+    assert playwright_browser.browser is dummy_browser
+    assert dummy_playwright.chromium.connects == 1
+    assert playwright_browser.context.browser is dummy_browser
+    assert page is playwright_browser.page
+    assert not closed_browser.is_connected()
+    assert pwmod._BROWSERS[playwright_browser.cdp_url] is dummy_browser
+
+
+@pytest.mark.asyncio
+async def test_playwright_browser_replaces_closed_context(dummy_playwright, dummy_browser, playwright_browser):
+    await playwright_browser._ensure_browser()
+    playwright_browser.context = ClosedContext(dummy_browser)
+
+    # Only the context is replaced, the browser connection is kept
+    await playwright_browser._ensure_page()
+    assert playwright_browser.context is dummy_browser.contexts[0]
+    assert playwright_browser.page is dummy_browser.contexts[0].pages[0]
+    assert dummy_playwright.chromium.connects == 1
+
+
+@pytest.mark.asyncio
+async def test_playwright_browser_restarts_dead_driver(monkeypatch, dummy_browser):
+    class DeadChromium:
+        async def connect_over_cdp(self, cdp_url):
+            raise Exception("Connection closed while reading from the driver")
+
+    dead_runtime = DummyPlaywright(None)
+    dead_runtime.chromium = DeadChromium()
+    runtimes = [dead_runtime, DummyPlaywright(dummy_browser)]
+    monkeypatch.setattr(pwmod, "async_playwright", lambda: runtimes.pop(0))
+
+    pw = PlaywrightBrowser(cdp_url="http://localhost:9222")
+    try:
+        # The runtime whose driver died is replaced instead of failing every later connect
+        await pw._ensure_page()
+        assert pw.browser is dummy_browser
+        assert runtimes == []
+        assert pwmod._PW_RUNTIME is not dead_runtime
+    finally:
+        await pw.cleanup()
+        await shutdown_shared_browsers()
@@ -96,7 +96,7 @@ class SupervisorService:
         
         # Create scheduled task
         try:
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             self.shutdown_task = loop.create_task(shutdown_after_timeout())
         except Exception as e:
             # If async task creation fails, fall back to thread timer